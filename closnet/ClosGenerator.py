@@ -4,12 +4,113 @@ Desc: Class to help build Clos topologies and the node attributes required.
 """
 
 # Core libraries
-from copy import deepcopy
+import sys
+from bisect import insort
 from ipaddress import IPv4Network
 from collections import defaultdict
 
 # External libraries
-import networkx as nx
+import numpy as np
+
+# Custom libraries
+from closnet.ClosGraph import ClosGraph
+from closnet.utils.JSON import dumps
+
+
+def _concatPrefix(prefix, addition):
+    """
+    Integer equivalent of appending str(addition) to str(prefix), where a prefix of 0 is the empty prefix.
+    """
+
+    scale = 10
+    while scale <= addition:
+        scale *= 10
+
+    return prefix * scale + addition
+
+
+def _enumerateClosEdges(k, t, ports, lowestSpineTier):
+    """
+    Enumerate every edge of the folded-Clos using the modified BFS described in ClosGenerator.buildGraph, on integers only.
+    A pod prefix is carried as the integer its decimal string would spell (0 for the empty prefix), so prefixes
+    are de-duplicated exactly as their string form would be.
+
+    :param k: Degree shared by each node.
+    :param t: Number of tiers in the graph.
+    :param ports: Number of southbound ports, indexed by tier.
+    :param lowestSpineTier: The lowest spine tier, whose pod prefix is shared with the leaf tier below it.
+
+    :returns: Lists (northTier, northPrefix, northNum, southPrefix, southNum), one entry per edge in BFS order.
+    """
+
+    half = k // 2
+
+    northTier = []
+    northPrefix = []
+    northNum = []
+    southPrefix = []
+    southNum = []
+
+    currentTierPrefix = [0] # Start from the empty prefix at the top tier
+    currentPodNodes = half**(t-1)
+    currentTier = t
+
+    while len(currentTierPrefix) > 0:
+        numPorts = ports[currentTier]
+        nextTierPrefix = []
+        nextTierVisited = set()
+
+        # Which of the three tier cases applies, and its divisor, are fixed for the whole tier.
+        aboveSpine = currentTier > lowestSpineTier
+        queuePrefixes = currentTier >= lowestSpineTier
+        if(aboveSpine):
+            podDivisor = currentPodNodes // half
+
+        for currentPrefix in currentTierPrefix:
+            for node in range(1, currentPodNodes+1):
+                # All tiers > 2. The south node number is the same for every port, only the prefix changes.
+                if(aboveSpine):
+                    num = ((node-1) % podDivisor) + 1
+
+                # The Leaf tier needs to have the same prefix of the spine tier (tier-2), as that is the smallest unit (pod).
+                elif(queuePrefixes):
+                    prefix = currentPrefix
+
+                # Tier 1 connects to Tier 0, the compute nodes, which use the full leaf name (prefix + number) as their prefix.
+                else:
+                    prefix = _concatPrefix(currentPrefix, node)
+
+                for intf in range(1, numPorts+1):
+                    if(aboveSpine):
+                        prefix = _concatPrefix(currentPrefix, intf)
+                    else:
+                        num = intf
+
+                    # Per BFS logic, queue up any spine or leaf prefix that has not been visited yet.
+                    if(queuePrefixes and prefix not in nextTierVisited):
+                        nextTierVisited.add(prefix)
+                        nextTierPrefix.append(prefix)
+
+                    northTier.append(currentTier)
+                    northPrefix.append(currentPrefix)
+                    northNum.append(node)
+                    southPrefix.append(prefix)
+                    southNum.append(num)
+
+        currentTierPrefix = nextTierPrefix
+
+        # Proper distribution of links for 2-tier topologies
+        if(currentTier == t and t == lowestSpineTier):
+            currentPodNodes = k
+
+        # The number of connections in the next tier below will be cut down appropriately
+        if(currentTier > lowestSpineTier):
+            currentPodNodes = currentPodNodes // half
+
+        currentTier -= 1 # Now that the current tier is complete, move down to the next one
+
+    return northTier, northPrefix, northNum, southPrefix, southNum
+
 
 class ClosGenerator:
     # Vertex prefixes to denote position in topology (TOF = Top of Fabric).
@@ -35,11 +136,22 @@ class ClosGenerator:
         :param southboundPortsConfig: Custom override for the number of southbound interfaces for devices at a given set of tiers
         """
 
-        self.clos = nx.Graph(topTier=t)
+        self.clos = ClosGraph(topTier=t)
+
+        # Node names grouped by tier, each list kept sorted as nodes are placed in the topology.
+        self.nodesByTier = defaultdict(list)
+
+        # Each leaf and the compute nodes below it, filled in by finalizeGraph once the topology is built.
+        self.leafComputeNetworks = {}
         
         self.sharedDegree = k
         self.numTiers = t
 
+        # The node title used at each tier below the top tier, looked up by getNodeTitle.
+        self.tierTitles = {tier: self.SPINE_NAME for tier in range(self.LOWEST_SPINE_TIER, t)}
+        self.tierTitles[self.LEAF_TIER] = self.LEAF_NAME
+        self.tierTitles[self.COMPUTE_TIER] = self.COMPUTE_NAME
+
         # Check to make sure the input is valid, return an error if not
         if(self.isNotValidClosInput()):
             raise ValueError("Invalid Clos input (must be equal number of north and south links)")
@@ -51,6 +163,13 @@ class ClosGenerator:
         if(southboundPortsConfig):
             self.setSouthboundPorts(southboundPortsConfig)
 
+        # Size of the folded-Clos, shared by getClosStats and logGraphInfo.
+        self.numTofNodes = (k//2)**(t-1)
+        self.numServers = 2*((k//2)**t)
+        self.numSwitches = ((2*t)-1)*((k//2)**(t-1))
+        self.numLeaves = 2*((k//2)**(t-1))
+        self.numPods = 1 if t == 2 else 2*((k//2)**(t-2))
+
     def isNotValidClosInput(self):
         """
         Checks if the shared degree inputted is an even number and that the number of tiers is at least 2. This confirms that the folded-Clos will have a 1:1 oversubscription ratio.
@@ -84,15 +203,9 @@ class ClosGenerator:
         """
 
         if(currentTier == topTier):
-            title = self.TOF_NAME    
-        elif(currentTier > self.LEAF_TIER):
-            title = self.SPINE_NAME
-        elif(currentTier == self.LEAF_TIER):
-            title = self.LEAF_NAME
-        elif(currentTier == self.COMPUTE_TIER):
-            title = self.COMPUTE_NAME
+            title = self.TOF_NAME
         else:
-            title = ""
+            title = self.tierTitles.get(currentTier, "")
 
         return title
        
@@ -115,34 +228,9 @@ class ClosGenerator:
         else:
             name = f"{title}{currentTier}_{nodeNum}"
 
-        return name
-
-    def generatePrefix(self, prefix, addition):
-        """
-        Generate the prefix for a given tier within a pod in the topology.
-        
-        :param prefix: The starting prefix to modify.
-        :param addition: Additional value to add to the starting prefix to create a new prefix.
-
-        :returns: The new prefix.
-        """
-
-        return prefix + addition
-
-    def determinePrefixVisitedStatus(self, prefix, prefixList):
-        """
-        Determine if the prefix has been visited in the BFS algorithm yet. If it has not, add it to be visited.
-        
-        :param prefix: The prefix for a given tier within a pod in the topology.
-        :param prefixList: The list of visited prefixes (tiers within a pod).
-        """
+        # The same name is generated once per edge, so keep a single shared copy of it.
+        return sys.intern(name)
 
-        if(prefix not in prefixList):
-            prefixList.append(prefix)
-
-        return
-
-    
     def connectNodes(self, northNode, southNode, northTier, southTier):
         """
         Connect two nodes together via an edge. The nodes must be in adjacent tiers (ex: tier 2 and tier 3). The nodes also understand if their new neighbor is above them (northbound) or below them (southbound). Subclasses specific to a protocol should override this method with its specific attribute needs beyond north-south interconnection. This base method is provided to simply view the output of a given folded-Clos topology.
@@ -153,15 +241,19 @@ class ClosGenerator:
         :param southTier: The tier value N-1.
         """
         
+        nodes = self.clos.nodes
+
         # Only add the nodes to the topology if they haven't already been added prior.
-        if(northNode not in self.clos):
+        if(northNode not in nodes):
             self.clos.add_node(northNode, northbound=[], southbound=[], tier=northTier)
-        if(southNode not in self.clos):
+            insort(self.nodesByTier[northTier], northNode)
+        if(southNode not in nodes):
             self.clos.add_node(southNode, northbound=[], southbound=[], tier=southTier)
+            insort(self.nodesByTier[southTier], southNode)
         
         # Note that they are connected to each other in the appropriate direction.
-        self.clos.nodes[northNode]["southbound"].append(southNode)
-        self.clos.nodes[southNode]["northbound"].append(northNode)
+        nodes[northNode]["southbound"].append(southNode)
+        nodes[southNode]["northbound"].append(northNode)
         
         # Add the edge between the two nodes to the topology
         self.clos.add_edge(northNode, southNode)
@@ -176,65 +268,45 @@ class ClosGenerator:
 
         k = self.sharedDegree
         t = self.numTiers
-
-        currentTierPrefix = [""] # Queue for current prefix being connected to a southern prefix
-        nextTierPrefix = [] # Queue for the prefixes of the tier directly south of the current tier
-
-        currentPodNodes = (k//2)**(t-1) # Number of top-tier nodes to start, but will shrink at lower tiers
         topTier = t # The starting tier, and the highest tier in the topology
-        currentTier = t # Tracking the tiers as it iterates down them
 
-        while currentTierPrefix:
-            currentPrefix = currentTierPrefix.pop(0)
+        # Get the number of southbound ports for each tier.
+        ports = [0] + [self.southboundPorts[tier] for tier in range(1, t+1)]
 
-            nodeNum = 0 # The number associated with a given node, appended after the prefix (ex: 1-1-1, pod 1-1, node number 1)
+        # Work out which nodes connect to which on integers first, then name and connect them in the same BFS order.
+        edges = _enumerateClosEdges(k, t, ports, self.LOWEST_SPINE_TIER)
 
-            for node in range(1,currentPodNodes+1):
-                # Determine the name of the current node at the current tier
-                northNode = self.generateNode(currentPrefix, str(node), currentTier, topTier)
+        # Names for each number and prefix are built once and reused across edges.
+        _, _, northNums, _, southNums = edges
+        numNames = [str(num) for num in range(max(northNums + southNums, default=0) + 1)]
+        prefixNames = {0: ""}
 
-                # Get the number of southbound ports for this tier and add 1 because range is exclusive.
-                portRange = self.southboundPorts[currentTier] + 1
+        northKey = None
+        for northTier, northPrefix, northNum, southPrefix, southNum in zip(*edges):
+            # Edges come grouped by north node, so only name it when a new one starts (as the BFS would).
+            if((northTier, northPrefix, northNum) != northKey):
+                northKey = (northTier, northPrefix, northNum)
+                northNode = self.generateNode(prefixNames[northPrefix], numNames[northNum], northTier, topTier)
 
-                for intf in range(1, portRange):
-                    # Per BFS logic, mark the neighbor as visited if it has not already and add it to the queue.
+            if(southPrefix not in prefixNames):
+                prefixNames[southPrefix] = str(southPrefix)
 
-                    # All tiers > 2.
-                    if(currentTier > self.LOWEST_SPINE_TIER):
-                        southPrefix = self.generatePrefix(currentPrefix, str(intf))
-                        self.determinePrefixVisitedStatus(southPrefix, nextTierPrefix)
-                        southNodeNum = (nodeNum%(currentPodNodes // (k//2)))+1
+            southNode = self.generateNode(prefixNames[southPrefix], numNames[southNum], northTier-1, topTier)
 
-                    # The Leaf tier needs to have the same prefix of the spine tier (tier-2), as that is the smallest unit (pod).
-                    elif(currentTier == self.LOWEST_SPINE_TIER):
-                        southPrefix = currentPrefix
-                        self.determinePrefixVisitedStatus(southPrefix, nextTierPrefix)
-                        southNodeNum = intf
+            self.connectNodes(northNode, southNode, northTier, northTier-1)
 
-                    # Tier 1 connects to Tier 0, the compute nodes.
-                    elif(currentTier == self.LEAF_TIER):
-                        southPrefix = northNode.split('_', 1)[1]
-                        southNodeNum = intf
+        self.finalizeGraph()
 
-                    southNode = self.generateNode(southPrefix, str(southNodeNum), currentTier-1, topTier)
-
-                    self.connectNodes(northNode, southNode, currentTier, currentTier-1)
-
-                nodeNum += 1
-
-            if(not currentTierPrefix):
-                currentTierPrefix = deepcopy(nextTierPrefix)
-                nextTierPrefix.clear()
+        return
 
-                # Proper distribution of links for 2-tier topologies
-                if(currentTier == topTier and topTier == self.LOWEST_SPINE_TIER):
-                    currentPodNodes = k
+    def finalizeGraph(self):
+        """
+        Work out the information that only depends on the finished topology, once, after buildGraph has connected every node.
+        """
 
-                # The number of connections in the next tier below will be cut down appropriately
-                if(currentTier > self.LOWEST_SPINE_TIER):
-                    currentPodNodes = currentPodNodes // (k//2)
+        nodes = self.clos.nodes
+        self.leafComputeNetworks = {leaf: (leaf,) + tuple(nodes[leaf]["southbound"]) for leaf in self.nodesByTier.get(self.LEAF_TIER, ())}
 
-                currentTier -= 1 # Now that the current tier is complete, move down to the next one
         return
                 
     def getClosStats(self):
@@ -244,17 +316,7 @@ class ClosGenerator:
         :returns: A string containing a number of facts about the folded-Clos topology.
         """
 
-        numTofNodes = (self.sharedDegree//2)**(self.numTiers-1)
-        numServers = 2*((self.sharedDegree//2)**self.numTiers)
-        numSwitches = ((2*self.numTiers)-1)*((self.sharedDegree//2)**(self.numTiers-1))
-        numLeaves = 2*((self.sharedDegree//2)**(self.numTiers-1))
-        
-        if(self.numTiers == 2):
-            numPods = 1
-        else:
-            numPods = 2*((self.sharedDegree//2)**(self.numTiers-2))
-
-        stats = f"Number of ToF Nodes: {numTofNodes}\nNumber of physical servers: {numServers}\nNumber of networking nodes: {numSwitches}\nNumber of leaves: {numLeaves}\nNumber of Pods: {numPods}\n"
+        stats = f"Number of ToF Nodes: {self.numTofNodes}\nNumber of physical servers: {self.numServers}\nNumber of networking nodes: {self.numSwitches}\nNumber of leaves: {self.numLeaves}\nNumber of Pods: {self.numPods}\n"
         
         return stats
     
@@ -276,6 +338,22 @@ class ClosGenerator:
         
         return self.clos.nodes
 
+    def toNumpyAdjacency(self):
+        """
+        Export the topology as integer arrays for array-based analysis. Each node is identified by its position in the returned list of names.
+
+        :returns: A tuple (names, edges, tiers): the node names, an (E, 2) int32 array of the node IDs at each end of every edge, and an int8 array of each node's tier.
+        """
+
+        names = list(self.getNodes())
+        nodeIds = {name: nodeId for nodeId, name in enumerate(names)}
+        networks = self.getNetworks()
+
+        edges = np.fromiter((nodeIds[node] for network in networks for node in network), dtype=np.int32, count=2*len(networks)).reshape(-1, 2)
+        tiers = np.fromiter((self.clos.nodes[name]["tier"] for name in names), dtype=np.int8, count=len(names))
+
+        return names, edges, tiers
+
     def iterNodes(self, noComputeNodes=False):
         for node in self.getNodes():
             if(noComputeNodes and not self.isNetworkNode(node)):
@@ -287,7 +365,19 @@ class ClosGenerator:
         return self.clos.nodes[node]["tier"] > self.COMPUTE_TIER
     
     def getNodeAttribute(self, node, attribute, subattribute=None):
-        return self.clos.nodes[node][attribute] if subattribute is None else self.clos.nodes[node][attribute][subattribute]
+        attrs = self.clos.nodes[node]
+        return attrs[attribute] if subattribute is None else attrs[attribute][subattribute]
+
+    def getNodeAttrDict(self, node):
+        """
+        Return the attribute dictionary of a node. Callers reading several attributes of the same node can hold on to it
+        instead of going through getNodeAttribute for each one.
+
+        :param node: The name of the node.
+        :returns: The node's attribute dictionary, which is the live dictionary and not a copy.
+        """
+
+        return self.clos.nodes[node]
 
     def logGraphInfo(self):
         """
@@ -298,39 +388,59 @@ class ClosGenerator:
         t = self.numTiers
         topTier = t
 
-        numTofNodes = (k//2)**(t-1)
-        numServers = 2*((k//2)**t)
-        numSwitches = ((2*t)-1)*((k//2)**(t-1))
-        numLeaves = 2*((k//2)**(t-1))
-        numPods = 2*((k//2)**(t-2))
-        
+        # Build the whole log in memory and write it out in one go.
+        parts = [f"=============\nFOLDED CLOS\nk = {k}, t = {t}\n{k}-port devices with {t} tiers.\n=============\n",
+                 self.getClosStats()]
+
+        for tier in reversed(range(topTier+1)):
+            parts.append(f"\n== TIER {tier} ==\n")
+
+            for node in self.nodesByTier.get(tier, ()):
+                parts.append(f"{node}\n\tnorthbound:\n")
+                parts.extend(f"\t\t{n}\n" for n in self.clos.nodes[node]["northbound"])
+
+                parts.append("\n\tsouthbound:\n")
+                parts.extend(f"\t\t{s}\n" for s in self.clos.nodes[node]["southbound"])
+
         with open(f'clos_k{self.sharedDegree}_t{self.numTiers}.log', 'w') as logFile:
-            logFile.write("=============\nFOLDED CLOS\nk = {k}, t = {t}\n{k}-port devices with {t} tiers.\n=============\n".format(k=k, t=t))
-
-            logFile.write("Number of ToF Nodes: {}\n".format(numTofNodes))
-            logFile.write("Number of physical servers: {}\n".format(numServers))
-            logFile.write("Number of networking nodes: {}\n".format(numSwitches))
-            logFile.write("Number of leaves: {}\n".format(numLeaves))
-            logFile.write("Number of Pods: {}\n".format(numPods))
-
-            for tier in reversed(range(topTier+1)):
-                nodes = [v for v in self.clos if self.clos.nodes[v]["tier"] == tier]
-                logFile.write("\n== TIER {} ==\n".format(tier))
-
-                for node in sorted(nodes):
-                    logFile.write(node)
-                    logFile.write("\n\tnorthbound:\n")
-                    
-                    for n in self.clos.nodes[node]["northbound"]:
-                        logFile.write("\t\t{}\n".format(n))
-                        
-                    logFile.write("\n\tsouthbound:\n")
-                    
-                    for s in self.clos.nodes[node]["southbound"]:
-                        logFile.write("\t\t{}\n".format(s))
+            logFile.write("".join(parts))
                         
         return
 
+    def jsonGraphHeader(self):
+        '''
+        Get the top-level entries of the JSON-formatted graph information that describe the topology as a whole.
+
+        :returns: Dictionary of the entries that come before the tiers.
+        '''
+
+        return {"sharedDegree": self.sharedDegree, 
+                "numTiers": self.numTiers,
+                "protocol": self.PROTOCOL}
+
+    def iterJsonGraphTiers(self):
+        '''
+        Iterate over the tiers of the JSON-formatted graph information, from the top tier down.
+
+        :returns: Yield (key, nodes) pairs, where nodes lazily yields the (node, node information) pairs of that tier.
+        '''
+
+        for tier in reversed(range(self.numTiers+1)):
+            yield f"tier_{tier}", self.iterJsonTierNodes(tier)
+
+    def iterJsonTierNodes(self, tier):
+        '''
+        Iterate over the JSON-formatted information of each node in a tier.
+
+        :param tier: The folded-Clos tier to describe.
+        :returns: Yield (node, node information) pairs.
+        '''
+
+        nodes = self.clos.nodes
+        for node in self.nodesByTier.get(tier, ()):
+            attrs = nodes[node]
+            yield node, {"northbound": list(attrs["northbound"]), "southbound": list(attrs["southbound"])}
+
     def jsonGraphInfo(self):
         '''
         Get a JSON-formatted output of the graph information
@@ -338,43 +448,57 @@ class ClosGenerator:
         :returns: JSON object containing the folded-Clos configuration.
         '''
 
-        jsonData = {"sharedDegree": self.sharedDegree, 
-                    "numTiers": self.numTiers,
-                    "protocol": self.PROTOCOL}
+        jsonData = self.jsonGraphHeader()
 
-        for tier in reversed(range(self.numTiers+1)):
-            nodes = [v for v in self.clos if self.clos.nodes[v]["tier"] == tier]
-            jsonData[f"tier_{tier}"] = {}
+        for key, nodes in self.iterJsonGraphTiers():
+            jsonData[key] = dict(nodes)
+
+        return jsonData
 
-            for node in sorted(nodes):
-                jsonData[f"tier_{tier}"][node] = {"northbound": [], "southbound": []}
+    def jsonGraphInfoStream(self, fp):
+        '''
+        Write the JSON-formatted graph information to a file one node at a time, without holding all of it in memory.
+
+        :param fp: A text file object to write the JSON object to.
+        '''
 
-                for northNode in self.clos.nodes[node]["northbound"]:
-                    jsonData[f"tier_{tier}"][node]["northbound"].append(northNode)
+        separator = "{"
+        for key, value in self.jsonGraphHeader().items():
+            fp.write(f"{separator}{dumps(key)}:{dumps(value)}")
+            separator = ","
 
-                for southNode in self.clos.nodes[node]["southbound"]:
-                    jsonData[f"tier_{tier}"][node]["southbound"].append(southNode)
+        for key, nodes in self.iterJsonGraphTiers():
+            fp.write(f"{separator}{dumps(key)}:")
+            separator = "{"
 
+            for node, nodeData in nodes:
+                fp.write(f"{separator}{dumps(node)}:{dumps(nodeData)}")
+                separator = ","
 
-        return jsonData
+            fp.write("}" if separator == "," else "{}")
+            separator = ","
+
+        fp.write("}" if separator == "," else "{}")
+
+        return
 
     def saveAsGraphml(self):
         SMALL_PADDING = " " * 2
         LARGE_PADDING = " " * 4
         
+        parts = ["<?xml version='1.0' encoding='utf-8'?>\n",
+                 '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n',
+                 f'{SMALL_PADDING}<graph edgedefault="undirected">\n']
+
+        # Fill in the nodes first
+        parts.extend(f'{LARGE_PADDING}<node id="{node}" />\n' for node in self.getNodes())
+
+        # Then the edges
+        parts.extend(f'{LARGE_PADDING}<edge source="{node[0]}" target="{node[1]}" />\n' for node in self.getNetworks())
+
+        parts.append(f"{SMALL_PADDING}</graph>\n</graphml>")
+
         with open(f'clos_k{self.sharedDegree}_t{self.numTiers}.graphml', 'w') as graphmlFile:
-            graphmlFile.write("<?xml version='1.0' encoding='utf-8'?>\n")
-            graphmlFile.write('<graphml xmlns="http://graphml.graphdrawing.org/xmlns" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n')
-            graphmlFile.write(f'{SMALL_PADDING}<graph edgedefault="undirected">\n')
-            
-            # Fill in the nodes first
-            for node in self.getNodes():
-                graphmlFile.write(f'{LARGE_PADDING}<node id="{node}" />\n'.rjust(4))
-
-            # Then the edges
-            for node in self.getNetworks():
-                graphmlFile.write(f'{LARGE_PADDING}<edge source="{node[0]}" target="{node[1]}" />\n')
-                
-            graphmlFile.write(f"{SMALL_PADDING}</graph>\n</graphml>")
+            graphmlFile.write("".join(parts))
         
-        return
\ No newline at end of file
+        return
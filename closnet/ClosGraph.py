@@ -0,0 +1,138 @@
+"""
+Desc: Lightweight undirected graph used while a folded-Clos is being built. It keeps nodes and edges in plain
+      dictionaries and exposes the small part of the NetworkX Graph interface the generators rely on.
+"""
+
+# External libraries
+import networkx as nx
+
+
+class ClosEdgeView:
+    """
+    Read-only view over the edges of a ClosGraph, iterated and indexed the same way as a NetworkX EdgeView.
+    The edge list is walked once and cached until the graph gains another edge.
+    """
+
+    def __init__(self, adj):
+        self._adj = adj
+        self._edges = None      # (u, v) for every edge
+        self._edgeData = None   # (u, v, attributes) for every edge
+
+    def __call__(self):
+        return self
+
+    def __iter__(self):
+        if(self._edges is None):
+            self._edges = tuple((node, neighbor) for node, neighbor, _ in self.data())
+
+        return iter(self._edges)
+
+    def data(self):
+        """
+        Iterate over the edges along with their attribute dictionaries, as NetworkX's EdgeView.data() does.
+
+        :returns: An iterator of (u, v, attributes) for every edge.
+        """
+
+        if(self._edgeData is None):
+            self._edgeData = tuple(self._walk())
+
+        return iter(self._edgeData)
+
+    def _walk(self):
+        # Same order and orientation as NetworkX: each edge is reported once, from the first of its two nodes to be added.
+        seen = set()
+        for node, neighbors in self._adj.items():
+            for neighbor, attr in neighbors.items():
+                if(neighbor not in seen):
+                    yield (node, neighbor, attr)
+            seen.add(node)
+
+    def invalidate(self):
+        """
+        Drop the cached edge lists, called whenever an edge is added.
+        """
+
+        self._edges = None
+        self._edgeData = None
+
+    def __len__(self):
+        if(self._edgeData is None):
+            return sum(len(neighbors) for neighbors in self._adj.values()) // 2
+
+        return len(self._edgeData)
+
+    def __contains__(self, edge):
+        u, v = edge
+        return u in self._adj and v in self._adj[u]
+
+    def __getitem__(self, edge):
+        u, v = edge
+        return self._adj[u][v]
+
+
+class ClosGraph:
+    """
+    Undirected graph backed by dictionaries: node name -> attribute dictionary, and node name -> neighbor -> edge attribute dictionary.
+    """
+
+    def __init__(self, **attr):
+        """
+        Initializes an empty graph.
+
+        :param attr: Graph-level attributes, kept in the graph dictionary just like NetworkX does.
+        """
+
+        self.graph = attr
+        self.nodes = {}  # Node name -> attribute dictionary
+        self.adj = {}    # Node name -> {neighbor name -> edge attribute dictionary}
+        self.edges = ClosEdgeView(self.adj)
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __getitem__(self, node):
+        return self.adj[node]
+
+    def add_node(self, node, **attr):
+        if(node not in self.nodes):
+            self.nodes[node] = attr
+            self.adj[node] = {}
+        else:
+            self.nodes[node].update(attr)
+
+        return
+
+    def add_edge(self, u, v, **attr):
+        # Unknown endpoints are added without any attributes, as NetworkX would.
+        if(u not in self.nodes):
+            self.add_node(u)
+        if(v not in self.nodes):
+            self.add_node(v)
+
+        edgeAttr = self.adj[u].get(v, {})
+        edgeAttr.update(attr)
+        self.adj[u][v] = edgeAttr
+        self.adj[v][u] = edgeAttr
+        self.edges.invalidate()
+
+        return
+
+    def toNetworkx(self):
+        """
+        Export the graph as a NetworkX Graph with the same nodes, edges, and attributes.
+
+        :returns: A NetworkX Graph equivalent to this graph.
+        """
+
+        graph = nx.Graph(**self.graph)
+        graph.add_nodes_from(self.nodes.items())
+        graph.add_edges_from(self.edges.data())
+
+        return graph
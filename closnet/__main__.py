@@ -189,7 +189,7 @@ def saveTopologyConfig(topologyName: str, topology: ClosGenerator) -> nx.graph:
     :returns: The topology configuration as a NetworkX graph.
     '''
 
-    topologyConfig = nx.node_link_data(topology.clos)
+    topologyConfig = nx.node_link_data(topology.clos.toNetworkx())
 
     fileName = f"{topologyName}.json"
     with open(os.path.join(CLOS_TOPOS_DIR, fileName), mode="w") as configFile:
@@ -1,5 +1,7 @@
 # Core libraries
-from ipaddress import IPv4Network
+import sys
+from bisect import insort
+from ipaddress import IPv4Address, IPv4Network
 
 # Custom libraries
 from closnet.ClosGenerator import ClosGenerator
@@ -38,14 +40,26 @@ class BGPClosConfig(ClosGenerator):
         self.ASNAssignment = {None : None}
         self.currentASN = self.PRIVATE_ASN_RANGE_START
        
-        # Define the address space for the core and edge networks
-        self.coreNetworks = list(IPv4Network(self.LEAF_SPINE_SUPERNET).subnets(prefixlen_diff=self.LEAF_SPINE_SUBNET_BITS))
-        self.edgeNetworks = list(IPv4Network(self.COMPUTE_SUPERNET).subnets(prefixlen_diff=self.COMPUTE_SUBNET_BITS))
+        # Define the address space for the core and edge networks. Subnets are handed out in order by index, as integers.
+        coreSupernet = IPv4Network(self.LEAF_SPINE_SUPERNET)
+        self.coreNetworkBase = int(coreSupernet.network_address)
+        self.coreSubnetSize = coreSupernet.num_addresses >> self.LEAF_SPINE_SUBNET_BITS
+        self.numCoreNetworks = 1 << self.LEAF_SPINE_SUBNET_BITS
+        self.nextCoreNetwork = 0
+
+        edgeSupernet = IPv4Network(self.COMPUTE_SUPERNET)
+        self.edgeNetworkBase = int(edgeSupernet.network_address)
+        self.edgeSubnetSize = edgeSupernet.num_addresses >> self.COMPUTE_SUBNET_BITS
+        self.numEdgeNetworks = 1 << self.COMPUTE_SUBNET_BITS
+        self.nextEdgeNetwork = 0
         
         # If only one compute subnet should be hanging off a leaf, then each leaf needs to be given a specific subnet
         self.singleComputeSubnet = singleComputeSubnet
         self.leafComputeSubnets = {}
 
+        # (leaf, compute node) pairs of every leaf-compute edge, to tell compute interfaces apart without looking the edge up.
+        self.leafComputeEdges = set()
+
         # A security node can be added to a top-tier node if desired.
         self.addSecNode = True if addSecurityNode else False
         
@@ -68,8 +82,9 @@ class BGPClosConfig(ClosGenerator):
         else:
             partialName = f"{title}{currentTier}_{prefix}"
 
-        # full node-ID
-        name = f"{partialName}{nodeNum}"
+        # full node-ID, with a single shared copy kept of each name and pod prefix since they are generated once per edge.
+        partialName = sys.intern(partialName)
+        name = sys.intern(f"{partialName}{nodeNum}")
 
         ASNPrefix = None
 
@@ -112,19 +127,31 @@ class BGPClosConfig(ClosGenerator):
             self.addressEdgeNodes(northNode, southNode)
             isComputeNetwork = True
 
+            if(southTier == self.COMPUTE_TIER):
+                self.leafComputeEdges.add((northNode, southNode))
+
         # Otherwise, it is a core network (leaf-spine or spine-spine).
         else:
             self.addressCoreNodes(northNode, southNode)
         
+        northAttrs = self.clos.nodes[northNode]
+        southAttrs = self.clos.nodes[southNode]
+
+        # Nodes are created by generateNode without a tier, so index them by tier the first time one is assigned.
+        if(northAttrs["tier"] is None):
+            insort(self.nodesByTier[northTier], northNode)
+        if(southAttrs["tier"] is None):
+            insort(self.nodesByTier[southTier], southNode)
+
         # Log the new information given to each node.
-        self.clos.nodes[northNode]["southbound"].append(southNode)
-        self.clos.nodes[northNode]["tier"] = northTier
+        northAttrs["southbound"].append(southNode)
+        northAttrs["tier"] = northTier
 
-        self.clos.nodes[southNode]["northbound"].append(northNode)
-        self.clos.nodes[southNode]["tier"] = southTier
+        southAttrs["northbound"].append(northNode)
+        southAttrs["tier"] = southTier
         
-        # Add the edge to the topology, while also noting the type of network.
-        self.clos.add_edge(northNode, southNode, computeNetwork=isComputeNetwork)
+        # Add the edge to the topology, while also noting the type of network and which end of it is north.
+        self.clos.add_edge(northNode, southNode, computeNetwork=isComputeNetwork, northNode=northNode)
 
         # If a security node is requested, add it to the first (T-1) top-tier spine.
         if(self.addSecNode and northNode == self.FIRST_TOF_NODE_NAME):
@@ -156,35 +183,37 @@ class BGPClosConfig(ClosGenerator):
         :param southNode: The node in tier N-1.
         """
         
-        NEXT_SUBNET = 0
-
         # If a single compute subnet is already defined for the leaf, reuse it and don't generate a new edge subnet. 
         if(northNode in self.leafComputeSubnets):
-            subnet = self.leafComputeSubnets[northNode]
-            #self.clos.nodes[northNode]["ipv4"][southNode] = self.clos.nodes[northNode]["ipv4"]["compute"]
+            networkAddress, southAddress = self.leafComputeSubnets[northNode]
+
+            # The low host addresses have run into the leaf's address at the top of the subnet.
+            if(southAddress >= networkAddress + self.edgeSubnetSize - 2):
+                raise IndexError(f"No host addresses left in the compute subnet of {northNode}")
 
         else:
             # Get next available edge subnet.
-            subnet = list(self.edgeNetworks.pop(NEXT_SUBNET))[:-1] # Remove broadcast address.
+            if(self.nextEdgeNetwork >= self.numEdgeNetworks):
+                raise IndexError(f"No edge subnets left in {self.COMPUTE_SUPERNET}")
 
-            networkAddress = subnet.pop(0) # Grab the network address to be advertised by BGP.
-            northAddress = subnet.pop() # Grab the last host address for the leaf node on the network.
+            networkAddress = self.edgeNetworkBase + self.nextEdgeNetwork * self.edgeSubnetSize # The network address to be advertised by BGP.
+            northAddress = networkAddress + self.edgeSubnetSize - 2 # The last host address (before broadcast) for the leaf node on the network.
+            southAddress = networkAddress + 1 # The first host address for the compute node on the network.
+            self.nextEdgeNetwork += 1
 
             # Add subnet advertisement information to leaf node.
-            self.clos.nodes[northNode]["advertise"].append(f"{networkAddress}/24")
+            northAttrs = self.clos.nodes[northNode]
+            northAttrs["advertise"].append(f"{IPv4Address(networkAddress)}/24")
 
             # Determine if an edge subnet needs to be reused and add addressing information to leaf node.
-            if(self.singleComputeSubnet):
-                self.leafComputeSubnets[northNode] = subnet
-                self.clos.nodes[northNode]["ipv4"]["compute"] = str(northAddress)
-            else:
-                self.clos.nodes[northNode]["ipv4"][southNode] = str(northAddress)
-
+            northAttrs["ipv4"]["compute" if self.singleComputeSubnet else southNode] = str(IPv4Address(northAddress))
 
-        southAddress = subnet.pop(0) # Grab the next available low host address for the compute node on the network.
+        # Remember the next available low host address for the next compute node on a reused subnet.
+        if(self.singleComputeSubnet):
+            self.leafComputeSubnets[northNode] = (networkAddress, southAddress + 1)
 
         # Add addressing information to compute node.
-        self.clos.nodes[southNode]["ipv4"][northNode] = str(southAddress)
+        self.clos.nodes[southNode]["ipv4"][northNode] = str(IPv4Address(southAddress))
 
         return
 
@@ -196,58 +225,62 @@ class BGPClosConfig(ClosGenerator):
         :param southNode: The node in tier N-1.
         """
         
-        NEXT_SUBNET = 0
- 
         # Get next available core subnet.
-        subnet = list(self.coreNetworks.pop(NEXT_SUBNET))[1:-1] # Remove network and broadcast address.
+        if(self.nextCoreNetwork >= self.numCoreNetworks):
+            raise IndexError(f"No core subnets left in {self.LEAF_SPINE_SUPERNET}")
+
+        networkAddress = self.coreNetworkBase + self.nextCoreNetwork * self.coreSubnetSize
+        self.nextCoreNetwork += 1
 
-        northAddress = subnet.pop(0) # Grab the next available low host address.
-        southAddress = subnet.pop(0)
+        # The two lowest host addresses go to the north and south node.
+        northAddress = IPv4Address(networkAddress + 1)
+        southAddress = IPv4Address(networkAddress + 2)
 
         # Add addressing information to core nodes.
-        self.clos.nodes[northNode]["ipv4"][southNode] = str(northAddress)
-        self.clos.nodes[southNode]["ipv4"][northNode] = str(southAddress)
+        nodes = self.clos.nodes
+        nodes[northNode]["ipv4"][southNode] = str(northAddress)
+        nodes[southNode]["ipv4"][northNode] = str(southAddress)
 
         return
 
-    def jsonGraphInfo(self):
-        '''
-        Get a JSON-formatted output of the graph information
-        
-        :returns: JSON object containing the folded-Clos configuration.
+    def iterJsonGraphTiers(self):
         '''
+        Iterate over the tiers of the JSON-formatted graph information, from the top tier down to the security node tier.
 
-        jsonData = {"sharedDegree": self.sharedDegree, 
-                    "numTiers": self.numTiers,
-                    "protocol": self.PROTOCOL}
+        :returns: Yield (key, nodes) pairs, where nodes lazily yields the (node, node information) pairs of that tier.
+        '''
 
         for tier in reversed(range(self.SEC_TIER, self.numTiers+1)):
-            nodes = [v for v in self.clos if self.clos.nodes[v]["tier"] == tier]
-            jsonData[f"tier_{tier}"] = {}
-
-            for node in sorted(nodes):
-                asn = self.clos.nodes[node]["ASN"]
-                jsonData[f"tier_{tier}"][node] = {f"ASN": asn,
-                                                  "advertisedRoutes": [],
-                                                  "northbound": [], 
-                                                  "southbound": []}
-
-                for route in self.clos.nodes[node]["advertise"]:
-                    jsonData[f"tier_{tier}"][node]["advertisedRoutes"].append(route)
-
-                for northNode in self.clos.nodes[node]["northbound"]:
-                    addr = self.clos.nodes[node]["ipv4"][northNode]
-                    jsonData[f"tier_{tier}"][node]["northbound"].append(f"{northNode} - {addr}")
-
-                if(tier == self.LEAF_TIER and self.singleComputeSubnet):
-                    addr = self.clos.nodes[node]["ipv4"]["compute"]
-                    jsonData[f"tier_{tier}"][node]["southbound"].append(f"compute - {addr}")
-                else:
-                    for southNode in self.clos.nodes[node]["southbound"]:
-                        addr = self.clos.nodes[node]["ipv4"][southNode]
-                        jsonData[f"tier_{tier}"][node]["southbound"].append(f"{southNode} - {addr}")
-
-        return jsonData
+            yield f"tier_{tier}", self.iterJsonTierNodes(tier)
+
+    def iterJsonTierNodes(self, tier):
+        '''
+        Iterate over the JSON-formatted information of each node in a tier, including its ASN and addressing.
+
+        :param tier: The folded-Clos tier to describe.
+        :returns: Yield (node, node information) pairs.
+        '''
+
+        # Whether the leaves share one compute subnet, and the node dicts, are the same for every node in the tier.
+        nodes = self.clos.nodes
+        sharedCompute = tier == self.LEAF_TIER and self.singleComputeSubnet
+
+        for node in self.nodesByTier.get(tier, ()):
+            # Bind the node's attributes once rather than looking them up for every neighbor.
+            attrs = nodes[node]
+            ipv4 = attrs["ipv4"]
+
+            nodeData = {"ASN": attrs["ASN"],
+                        "advertisedRoutes": list(attrs["advertise"]),
+                        "northbound": [f"{northNode} - {ipv4[northNode]}" for northNode in attrs["northbound"]], 
+                        "southbound": []}
+
+            if(sharedCompute):
+                nodeData["southbound"].append(f"compute - {ipv4['compute']}")
+            else:
+                nodeData["southbound"].extend(f"{southNode} - {ipv4[southNode]}" for southNode in attrs["southbound"])
+
+            yield node, nodeData
     
     def isNetworkNode(self, node):
         return False if node == "compute" else self.clos.nodes[node]["tier"] > self.COMPUTE_TIER
@@ -265,19 +298,21 @@ class BGPClosConfig(ClosGenerator):
 
         processedleafNodes = set()
         
-        for network in self.getNetworks():
-            networkType = "edge" if self.clos.edges[network]["computeNetwork"] else "core"
+        # Walk the edges together with their attributes, rather than looking each edge up again.
+        for u, v, attrs in self.clos.edges.data():
+            network = (u, v)
+            networkType = "edge" if attrs["computeNetwork"] else "core"
             
             if(networkType == "core" or self.singleComputeSubnet == False):
                 yield (network, self.generateFabricNetworkName(network, networkType)) if fabricFormating else network
 
             else:
-                leaf = network[0] if network[0].startswith(self.LEAF_NAME) else network[1]
+                leaf = attrs["northNode"] # The leaf is always the north end of an edge network.
 
                 if(leaf not in processedleafNodes):
 
-                    # Get the leaf southbound and then convert to tuple
-                    computeNetwork = (leaf,) + tuple(self.clos.nodes[leaf]["southbound"])
+                    # The leaf and its southbound neighbors, worked out once the topology was built
+                    computeNetwork = self.leafComputeNetworks[leaf]
 
                     processedleafNodes.add(leaf)
                     
@@ -290,17 +325,17 @@ class BGPClosConfig(ClosGenerator):
             else:
                 name = f"edge-{network[0]}-{network[1]}"
         else:
-            if(self.clos.nodes[network[0]]["tier"] > self.clos.nodes[network[1]]["tier"]):
-                name = f"core-{network[0]}-{network[1]}"
-            else:
-                name = f"core-{network[1]}-{network[0]}"
+            northNode = self.clos.edges[network]["northNode"]
+            southNode = network[1] if network[0] == northNode else network[0]
+            name = f"core-{northNode}-{southNode}"
 
         return name
 
     def generateFabricIntfName(self, node, network):
         otherNode = network[1] if network[0] == node else network[0]
 
-        if(self.clos.nodes[node]["tier"] == self.LEAF_TIER and self.clos.nodes[otherNode]["tier"] == self.COMPUTE_TIER and self.singleComputeSubnet == True):
+        # A leaf's side of an edge network shares the compute interface. Only checked when there is a single compute subnet.
+        if(self.singleComputeSubnet and (node, otherNode) in self.leafComputeEdges):
             #intfName = f"{node}-intf-compute"
             intfName = f"intf-compute"
         else:
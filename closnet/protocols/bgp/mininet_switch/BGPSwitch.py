@@ -1,3 +1,6 @@
+import os
+import signal
+
 from mininet.node import Node, Host
 
 class BGPSwitch(Node):
@@ -10,6 +13,17 @@ class BGPSwitch(Node):
     ID = 0
     ENABLE_BFD = False
 
+    # Command and file templates shared by every switch, filled in with the switch name (and daemon).
+    SETUP_CMDS = (('loopback', 'ifconfig lo up'), ('IPv4 forwarding', 'sysctl -w net.ipv4.ip_forward=1'))
+    CONFIG_FILE = '/tmp/{name}.conf'
+    PID_FILE = '/tmp/{name}.{daemon}.pid'
+    DAEMON_CMD = '/usr/lib/frr/{daemon} -d -N {name} -i {pid_file}'
+    VTYSH_CMD = 'vtysh -N "{name}" -f "{config_file}"'
+    DAEMONS = ('zebra', 'bfdd', 'bgpd')
+
+    # Echoed by a startup step that exits with an error, followed by the step's label.
+    STEP_FAILED = 'CLOSNET_STEP_FAILED'
+
     def __init__(self, name, **kwargs):
         kwargs['inNamespace'] = True
         super(BGPSwitch, self).__init__(name, **kwargs)
@@ -17,52 +31,30 @@ class BGPSwitch(Node):
         BGPSwitch.ID += 1
         self.switch_id = BGPSwitch.ID
 
+        # The FRR config and PID file paths never change, so work them out once for start and stop
+        self.config_file = self.CONFIG_FILE.format(name=name)
+        self.pid_files = {daemon: self.PID_FILE.format(name=name, daemon=daemon) for daemon in self.DAEMONS}
+
+    def enabled_daemons(self):
+        """FRR daemons run on this node, in start order: zebra first, then BFD (if requested) and BGP."""
+        return [daemon for daemon in self.DAEMONS if self.ENABLE_BFD or daemon != 'bfdd']
+
     def start(self, controllers):
-        # Turn on the loopback interface
-        self.cmd('ifconfig lo up')
-        self.waitOutput()
-
-        # Enable IPv4 forwarding
-        self.cmd("sysctl -w net.ipv4.ip_forward=1")
-        self.waitOutput()
-
-        # Define the path to the FRR configuration file
-        config_file = f"/tmp/{self.name}.conf"
-
-        # Start Zebra in the node's namespace
-        start_zebra = (
-            f'/usr/lib/frr/zebra '
-            f'-d '
-            f'-N {self.name} '
-            f'-i /tmp/{self.name}.zebra.pid'
-        )
-        self.cmd(start_zebra)
-        self.waitOutput()
-
-        # Start BFD in the node's namespace (if requested, otherwise it stays off)
-        if self.ENABLE_BFD:
-            start_bfdd = (
-                f'/usr/lib/frr/bfdd '
-                f'-d '
-                f'-N {self.name} '
-                f'-i /tmp/{self.name}.bfdd.pid'
-            )
-            self.cmd(start_bfdd)
-            self.waitOutput()
-
-        # Start BGP in the node's namespace
-        start_bgpd = (
-            f'/usr/lib/frr/bgpd '
-            f'-d '
-            f'-N {self.name} '
-            f'-i /tmp/{self.name}.bgpd.pid'
-        )
-        self.cmd(start_bgpd)
-        self.waitOutput()
-
-        # Load the config via vtysh
-        self.cmd(f'vtysh -N "{self.name}" -f "{config_file}"')
-        self.waitOutput()
+        daemons = self.enabled_daemons()
+
+        # Turn on the loopback interface and enable IPv4 forwarding, then start the daemons in the node's namespace
+        # and load the config via vtysh. Each step runs even if an earlier one fails, and reports itself if it does.
+        steps = list(self.SETUP_CMDS)
+        steps.extend((daemon, self.DAEMON_CMD.format(daemon=daemon, name=self.name, pid_file=self.pid_files[daemon])) for daemon in daemons)
+        steps.append(('vtysh config load', self.VTYSH_CMD.format(name=self.name, config_file=self.config_file)))
+
+        # Everything goes through one shell round trip. The daemons fork into the background (-d), so the single wait still covers every step.
+        output = self.cmd('; '.join(f"{cmd} || echo '{self.STEP_FAILED} {label}'" for label, cmd in steps))
+
+        failed = [line.split(' ', 1)[1].strip() for line in output.splitlines() if line.startswith(self.STEP_FAILED)]
+        if(failed):
+            print(f"Failed to start FRR on {self.name}: {', '.join(failed)}")
+            return
 
         print("FRR daemons" 
               f"{' (zebra, bgpd, bfdd)' if self.ENABLE_BFD else ' (zebra & bgpd)'} started on {self.name}")
@@ -70,31 +62,33 @@ class BGPSwitch(Node):
     def stop(self):
         """Stops FRR daemons running on this node."""
 
-        # List of daemons to stop
-        daemons = ['zebra', 'bgpd']
-        if self.ENABLE_BFD:
-                    daemons.append('bfdd')
+        # Stop the same daemons start launched
+        daemons = self.enabled_daemons()
 
-        # Terminate daemons using PIDs from PID files
+        # Terminate daemons using PIDs from PID files. The node only has its own network namespace,
+        # so the PID files and PIDs are read and signalled directly instead of through the node's shell.
         for daemon in daemons:
-            pid_file = f"/tmp/{self.name}.{daemon}.pid"
-
-            if self.cmd(f'test -f {pid_file} && echo "exists"').strip() == 'exists':
-                pid = self.cmd(f'cat {pid_file}').strip()
+            pid_file = self.pid_files[daemon]
 
-                try:
-                    # Kill the process inside the node's namespace
-                    self.cmd(f'kill {pid}')
-                    print(f"Terminated {daemon} for {self.name} (PID {pid})")
+            try:
+                with open(pid_file) as f:
+                    pid = int(f.read().strip())
+            except (OSError, ValueError):
+                print(f"PID file not found: {pid_file}")
+                continue
 
-                except Exception as e:
-                    print(f"Failed to terminate {daemon} for {self.name}: {e}")
+            try:
+                os.kill(pid, signal.SIGTERM)
+                print(f"Terminated {daemon} for {self.name} (PID {pid})")
 
-                # Remove the PID file
-                self.cmd(f'rm -f {pid_file}')
+            except OSError as e:
+                print(f"Failed to terminate {daemon} for {self.name}: {e}")
 
-            else:
-                print(f"PID file not found: {pid_file}")
+            # Remove the PID file
+            try:
+                os.remove(pid_file)
+            except OSError:
+                pass
 
         # Clean up any remaining files related to this node (not used currently, but if needed in the future)
         #self.cmd(f'rm -f /tmp/{self.name}.*')
@@ -1,6 +1,6 @@
 # Core libraries
-from ipaddress import IPv4Network
-from collections import defaultdict
+from bisect import insort
+from ipaddress import IPv4Address, IPv4Network
 
 # Custom libraries
 from closnet.ClosGenerator import ClosGenerator
@@ -11,6 +11,7 @@ class MTPClosConfig(ClosGenerator):
 
     COMPUTE_SUPERNET = '192.168.0.0/16'
     COMPUTE_SUBNET_BITS = 8
+    FABRIC_ADDRESS = "MTP" # Neighbors in the fabric are reached over MTP, not IPv4, so they have no address.
 
     def __init__(self, k, t, singleComputeSubnet=False, **kwargs):
         """
@@ -25,8 +26,12 @@ class MTPClosConfig(ClosGenerator):
         # Call superclass constructor to get graph setup
         super().__init__(k, t, **kwargs)
 
-        # Define the address space for the core and edge networks
-        self.edgeNetworks = list(IPv4Network(self.COMPUTE_SUPERNET).subnets(prefixlen_diff=self.COMPUTE_SUBNET_BITS))
+        # Define the address space for the edge networks. Subnets are handed out in order by index, as integers.
+        edgeSupernet = IPv4Network(self.COMPUTE_SUPERNET)
+        self.edgeNetworkBase = int(edgeSupernet.network_address)
+        self.edgeSubnetSize = edgeSupernet.num_addresses >> self.COMPUTE_SUBNET_BITS
+        self.numEdgeNetworks = 1 << self.COMPUTE_SUBNET_BITS
+        self.nextEdgeNetwork = 0
         
         # If only one compute subnet should be hanging off a leaf, then each leaf needs to be given a specific subnet
         self.singleComputeSubnet = singleComputeSubnet
@@ -43,25 +48,29 @@ class MTPClosConfig(ClosGenerator):
         :param southTier: The tier value N-1.
         """
         
+        nodes = self.clos.nodes
+
         # Only add the nodes to the topology if they haven't already been added prior.
-        if(northNode not in self.clos):
+        if(northNode not in nodes):
             self.clos.add_node(northNode, 
                                northbound=[], 
                                southbound=[], 
                                tier=northTier, 
-                               ipv4=defaultdict(lambda: "MTP"), 
+                               ipv4={}, 
                                isTopTier=True if self.numTiers == northTier else False)
-        if(southNode not in self.clos):
+            insort(self.nodesByTier[northTier], northNode)
+        if(southNode not in nodes):
             self.clos.add_node(southNode, 
                                northbound=[], 
                                southbound=[], 
                                tier=southTier, 
-                               ipv4=defaultdict(lambda: "MTP"), 
+                               ipv4={}, 
                                isTopTier=False)
+            insort(self.nodesByTier[southTier], southNode)
         
         # Mark each other as neighbors in their appropriate direction.
-        self.clos.nodes[northNode]["southbound"].append(southNode)
-        self.clos.nodes[southNode]["northbound"].append(northNode)
+        nodes[northNode]["southbound"].append(southNode)
+        nodes[southNode]["northbound"].append(northNode)
 
         # If one of the nodes is a compute node, this is an edge network (compute-leaf).
         isComputeNetwork = False
@@ -69,8 +78,8 @@ class MTPClosConfig(ClosGenerator):
             isComputeNetwork = True
             self.addressEdgeNodes(northNode, southNode)
                  
-        # Add the edge between the two nodes to the topology
-        self.clos.add_edge(northNode, southNode, computeNetwork=isComputeNetwork)
+        # Add the edge between the two nodes to the topology, noting the type of network and which end of it is north.
+        self.clos.add_edge(northNode, southNode, computeNetwork=isComputeNetwork, northNode=northNode)
 
         return
     
@@ -81,29 +90,34 @@ class MTPClosConfig(ClosGenerator):
         :param northNode: The node in tier N.
         :param southNode: The node in tier N-1.
         """
-        
-        NEXT_SUBNET = 0
 
         # If a single compute subnet is already defined for the leaf, reuse it and don't generate a new edge subnet. 
         if(northNode in self.leafComputeSubnets):
-            subnet = self.leafComputeSubnets[northNode]
+            networkAddress, southAddress = self.leafComputeSubnets[northNode]
+
+            # The low host addresses have run into the leaf's address at the top of the subnet.
+            if(southAddress >= networkAddress + self.edgeSubnetSize - 2):
+                raise IndexError(f"No host addresses left in the compute subnet of {northNode}")
+
         else:
             # Get next available edge subnet.
-            subnet = list(self.edgeNetworks.pop(NEXT_SUBNET))[1:-1] # Remove network and broadcast address.
+            if(self.nextEdgeNetwork >= self.numEdgeNetworks):
+                raise IndexError(f"No edge subnets left in {self.COMPUTE_SUPERNET}")
 
-            northAddress = subnet.pop() # Grab the last host address for the leaf node on the network.
+            networkAddress = self.edgeNetworkBase + self.nextEdgeNetwork * self.edgeSubnetSize
+            northAddress = networkAddress + self.edgeSubnetSize - 2 # The last host address (before broadcast) for the leaf node on the network.
+            southAddress = networkAddress + 1 # The first host address for the compute node on the network.
+            self.nextEdgeNetwork += 1
 
-            # Determine if an edge subnet needs to be reused and add addressing information to leaf node.
-            if(self.singleComputeSubnet):
-                self.leafComputeSubnets[northNode] = subnet
-                self.clos.nodes[northNode]["ipv4"]["compute"] = str(northAddress)
-            else:
-                self.clos.nodes[northNode]["ipv4"][southNode] = str(northAddress)
+            # Add addressing information to leaf node.
+            self.clos.nodes[northNode]["ipv4"]["compute" if self.singleComputeSubnet else southNode] = str(IPv4Address(northAddress))
 
-        southAddress = subnet.pop(0) # Grab the next available low host address for the compute node on the network.
+        # Remember the next available low host address for the next compute node on a reused subnet.
+        if(self.singleComputeSubnet):
+            self.leafComputeSubnets[northNode] = (networkAddress, southAddress + 1)
 
         # Add addressing information to compute node.
-        self.clos.nodes[southNode]["ipv4"][northNode] = str(southAddress)
+        self.clos.nodes[southNode]["ipv4"][northNode] = str(IPv4Address(southAddress))
 
         return
     
@@ -121,55 +135,62 @@ class MTPClosConfig(ClosGenerator):
 
         processedleafNodes = set()
         
-        for network in self.getNetworks():
-            networkType = "edge" if self.clos.edges[network]["computeNetwork"] else "core"
+        # Walk the edges together with their attributes, rather than looking each edge up again.
+        for u, v, attrs in self.clos.edges.data():
+            network = (u, v)
+            networkType = "edge" if attrs["computeNetwork"] else "core"
             
             if(networkType == "core" or self.singleComputeSubnet == False):
                 yield (network, self.generateFabricNetworkName(network, networkType)) if fabricFormating else network
 
             else:
-                leaf = network[0] if network[0].startswith(self.LEAF_NAME) else network[1]
+                leaf = attrs["northNode"] # The leaf is always the north end of an edge network.
 
                 if(leaf not in processedleafNodes):
 
-                    # Get the leaf southbound and then convert to tuple
-                    computeNetwork = (leaf,) + tuple(self.clos.nodes[leaf]["southbound"])
+                    # The leaf and its southbound neighbors, worked out once the topology was built
+                    computeNetwork = self.leafComputeNetworks[leaf]
 
                     processedleafNodes.add(leaf)
                     
                     yield (computeNetwork, self.generateFabricNetworkName(network, networkType)) if fabricFormating else computeNetwork
 
     
-    def jsonGraphInfo(self):
-            '''
-            Get a JSON-formatted output of the graph information
-            
-            :returns: JSON object containing the folded-Clos configuration.
-            '''
-
-            jsonData = {"protocol": self.PROTOCOL,
-                        "tiers": self.numTiers,
-                        "ports": self.sharedDegree
-                        }
-
-            for tier in reversed(range(self.numTiers+1)):
-                nodes = [v for v in self.clos if self.clos.nodes[v]["tier"] == tier]
-                jsonData[f"tier_{tier}"] = {}
-
-                for node in sorted(nodes):
-                    jsonData[f"tier_{tier}"][node] = {"northbound": [], 
-                                                    "southbound": []}
-
-                    for northNode in self.clos.nodes[node]["northbound"]:
-                        addr = self.clos.nodes[node]["ipv4"][northNode]
-                        jsonData[f"tier_{tier}"][node]["northbound"].append(f"{northNode} - {addr}")
-
-                    if(tier == self.LEAF_TIER and self.singleComputeSubnet):
-                        addr = self.clos.nodes[node]["ipv4"]["compute"]
-                        jsonData[f"tier_{tier}"][node]["southbound"].append(f"compute - {addr}")
-                    else:
-                        for southNode in self.clos.nodes[node]["southbound"]:
-                            addr = self.clos.nodes[node]["ipv4"][southNode]
-                            jsonData[f"tier_{tier}"][node]["southbound"].append(f"{southNode} - {addr}")
-
-            return jsonData
+    def jsonGraphHeader(self):
+        '''
+        Get the top-level entries of the JSON-formatted graph information that describe the topology as a whole.
+
+        :returns: Dictionary of the entries that come before the tiers.
+        '''
+
+        return {"protocol": self.PROTOCOL,
+                "tiers": self.numTiers,
+                "ports": self.sharedDegree}
+
+    def iterJsonTierNodes(self, tier):
+        '''
+        Iterate over the JSON-formatted information of each node in a tier, including its addressing.
+
+        :param tier: The folded-Clos tier to describe.
+        :returns: Yield (node, node information) pairs.
+        '''
+
+        # Values that are the same for every node in the tier.
+        nodes = self.clos.nodes
+        fabricAddress = self.FABRIC_ADDRESS
+        sharedCompute = tier == self.LEAF_TIER and self.singleComputeSubnet
+
+        for node in self.nodesByTier.get(tier, ()):
+            # Bind the node's attributes once rather than looking them up for every neighbor.
+            attrs = nodes[node]
+            ipv4 = attrs["ipv4"]
+
+            nodeData = {"northbound": [f"{northNode} - {ipv4.get(northNode, fabricAddress)}" for northNode in attrs["northbound"]], 
+                        "southbound": []}
+
+            if(sharedCompute):
+                nodeData["southbound"].append(f"compute - {ipv4.get('compute', fabricAddress)}")
+            else:
+                nodeData["southbound"].extend(f"{southNode} - {ipv4.get(southNode, fabricAddress)}" for southNode in attrs["southbound"])
+
+            yield node, nodeData
@@ -1,4 +1,6 @@
 from mininet.node import Node, Host
+import os
+import signal
 import subprocess
 
 class MTPSwitch(Node):
@@ -7,30 +9,52 @@ class MTPSwitch(Node):
     for data center networks.
     """
 
+    MTP_BINARY = './closnet/protocols/mtp/bin/mtp'
+
     def __init__(self, name, **params):
         params['inNamespace'] = True
         super(MTPSwitch, self).__init__(name, **params)
-        self.process = None
+        self.process_pid = None
+        self.log_file = f'/tmp/{name}.stdout'
 
 
     def start(self, controllers):
-        log_file = open(f'/tmp/{self.name}.stdout', 'w', buffering=1)
+        log_fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
 
-        # *** use self.popen so mnexec puts it inside the netns ***
-        self.process = self.popen(
-            ['./closnet/protocols/mtp/bin/mtp', self.name, '/tmp'],
-            stdout=log_file,
-            stderr=subprocess.STDOUT,
-        )
+        try:
+            if hasattr(os, 'posix_spawnp'):
+                # *** mnexec -da puts it inside the netns, exactly as self.popen would ***
+                # posix_spawn avoids forking the (large) Mininet process for every switch.
+                self.process_pid = os.posix_spawnp(
+                    'mnexec',
+                    ['mnexec', '-da', str(self.pid), self.MTP_BINARY, self.name, '/tmp'],
+                    os.environ,
+                    file_actions=[(os.POSIX_SPAWN_DUP2, log_fd, 1), (os.POSIX_SPAWN_DUP2, log_fd, 2)],
+                )
+            else:
+                # *** use self.popen so mnexec puts it inside the netns ***
+                self.process_pid = self.popen(
+                    [self.MTP_BINARY, self.name, '/tmp'],
+                    stdout=log_fd,
+                    stderr=subprocess.STDOUT,
+                ).pid
+        finally:
+            # The MTP process has its own copy of the log file descriptor now
+            os.close(log_fd)
 
         print(f"MTP started on {self.name}")
 
 
     def stop(self):
         # Ensure the process is terminated
-        if self.process:
-            self.process.terminate()
-            self.process.wait()
+        if self.process_pid:
+            try:
+                os.kill(self.process_pid, signal.SIGTERM)
+                os.waitpid(self.process_pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass # Already exited and reaped
+
+            self.process_pid = None
             print(f"MTP stopped on {self.name}\n")
 
 
@@ -9,6 +9,8 @@ Don't use this switch for any real experiments, it's just to learn and play arou
 from mininet.node import Switch
 from mininet.node import Node
 from mininet.log import info
+import os
+import signal
 import subprocess
 
 class TestSwitch(Switch):
@@ -57,7 +59,7 @@ class CCodeSwitch(Node):
 
     def __init__(self, name, **params):
         super(CCodeSwitch, self).__init__(name, **params)
-        self.process = None
+        self.process_pid = None
 
 
     def start(self, controllers):
@@ -65,19 +67,31 @@ class CCodeSwitch(Node):
         print(f"Starting CCodeSwitch {self.name}")
 
         # Open the log file in write mode
-        with open(f'/tmp/{self.name}.log', 'w') as log_file:
-            # Start the process
-            self.process = subprocess.Popen(
-                ['./closnet/protocols/test/bin/switch_logic_print', self.name, "/tmp"],
-                stdout=log_file,
-                stderr=subprocess.STDOUT)
+        log_fd = os.open(f'/tmp/{self.name}.log', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        argv = ['./closnet/protocols/test/bin/switch_logic_print', self.name, "/tmp"]
+
+        try:
+            # Start the process, with posix_spawn where available so Mininet isn't forked
+            if hasattr(os, 'posix_spawn'):
+                self.process_pid = os.posix_spawn(
+                    argv[0], argv, os.environ,
+                    file_actions=[(os.POSIX_SPAWN_DUP2, log_fd, 1), (os.POSIX_SPAWN_DUP2, log_fd, 2)])
+            else:
+                self.process_pid = subprocess.Popen(argv, stdout=log_fd, stderr=subprocess.STDOUT).pid
+        finally:
+            os.close(log_fd)
 
 
     def stop(self):
         # Ensure the process is terminated
-        if self.process:
-            self.process.terminate()
-            self.process.wait()
+        if self.process_pid:
+            try:
+                os.kill(self.process_pid, signal.SIGTERM)
+                os.waitpid(self.process_pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass # Already exited and reaped
+
+            self.process_pid = None
             print(f"CCodeSwitch {self.name} stopped")
 
 
@@ -17,16 +17,19 @@ class ClosConfigTopo(Topo):
             super(ClosConfigTopo, self).__init__()
 
     def build(self) -> None:
-        for edge in self.clos.edges():
-            # Add the nodes to the topology
-            node1 = self.getNode(edge[0])
-            node2 = self.getNode(edge[1])
+        edges = list(self.clos.edges())
 
+        # Add every node to the topology once, before any links reference them. Nodes are
+        # added in the order they first appear on an edge, which sets the switch start order.
+        for node in dict.fromkeys(node for edge in edges for node in edge):
+            self.addedNodes[node] = self.addClosNode(node)
+
+        for node1, node2 in edges:
             # Configure IPv4 addressing if necessary
             node1Address, node2Address = self.getIPv4Addressing(node1, node2)
 
             # Add the link between the nodes to the topology
-            self.addLink(node1, node2, 
+            self.addLink(self.addedNodes[node1], self.addedNodes[node2], 
                          params1=node1Address, params2=node2Address)
 
         return
@@ -34,34 +37,35 @@ class ClosConfigTopo(Topo):
 
     def getNode(self, node: str):
         if(node not in self.addedNodes):
-            # Get the node's topology tier to determine the type of device.
-            nodeTier = self.clos.nodes[node]['tier']
+            self.addedNodes[node] = self.addClosNode(node)
+
+        return self.addedNodes[node]
 
-            if(self.clos.nodes[node]['tier'] > self.COMPUTE_TIER):
-                mininetNode = self.addSwitch(node)
 
-                # Record the node as part of it's given tier
-                if nodeTier not in self.nodesByTier:
-                    self.nodesByTier[nodeTier] = []
+    def addClosNode(self, node: str):
+        # Get the node's topology tier to determine the type of device.
+        nodeTier = self.clos.nodes[node]['tier']
 
-                self.nodesByTier[nodeTier].append(node)  # Store the node name (ID)
+        if(nodeTier > self.COMPUTE_TIER):
+            mininetNode = self.addSwitch(node)
 
-            elif(self.clos.nodes[node]['tier'] == self.COMPUTE_TIER):
-                hostIPDict = self.clos.nodes[node].get('ipv4')
-                defaultGateway = list(hostIPDict.keys())[0]
-                hostIP = list(hostIPDict.values())[0]
-                    
-                mininetNode = self.addHost(node, 
-                                           ip=f"{hostIP}/24", 
-                                           defaultRoute=f"via {self.clos.nodes[defaultGateway]['ipv4'][node]}")
+            # Record the node as part of it's given tier
+            if nodeTier not in self.nodesByTier:
+                self.nodesByTier[nodeTier] = []
 
-            else:
-                raise Exception(f"{node} does not have a normal tier value, not adding.")
+            self.nodesByTier[nodeTier].append(node)  # Store the node name (ID)
 
-            self.addedNodes[node] = mininetNode
+        elif(nodeTier == self.COMPUTE_TIER):
+            hostIPDict = self.clos.nodes[node].get('ipv4')
+            defaultGateway = list(hostIPDict.keys())[0]
+            hostIP = list(hostIPDict.values())[0]
+                
+            mininetNode = self.addHost(node, 
+                                       ip=f"{hostIP}/24", 
+                                       defaultRoute=f"via {self.clos.nodes[defaultGateway]['ipv4'][node]}")
 
         else:
-            mininetNode = self.addedNodes[node]
+            raise Exception(f"{node} does not have a normal tier value, not adding.")
 
         return mininetNode
 
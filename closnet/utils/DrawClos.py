@@ -1,102 +1,191 @@
 # External Libraries
 import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 from copy import deepcopy
 from collections import defaultdict, deque
 from typing import Optional, Tuple
 
+# Custom libraries
+from closnet.utils.JIT import njit, HAVE_NUMBA
+
 __all__ = ["drawFoldedClos"]
 
+# Integer encodings used by the CSR form of the directed overlay.
+_SOUTH, _UNKNOWN, _NORTH = -1, 0, 1
+_UP, _DOWN = 0, 1
+_DIRECTION_CODES = {"south": _SOUTH, "unknown": _UNKNOWN, "north": _NORTH}
+
 # ---------------------------------------------------------------------------
 # Helper – build a *directed* view of the folded‑Clos so we can reason about
 #           north‑ and south‑bound traversal for valley‑free routing.
 # ---------------------------------------------------------------------------
 
-def _build_directed(topology: nx.Graph) -> nx.DiGraph:
+def _snapshot_nb(topology: nx.Graph) -> tuple[dict[str, set[str]], dict[str, set[str]]]:
+    """Copy every node's *northbound* / *southbound* lists into plain dicts of sets.
+
+    The helpers below consult these per node and per edge, so reading them
+    once avoids going back through NetworkX's node-attribute views each time,
+    and sets keep the per-edge direction lookup O(1) on high-radix switches.
+    """
+    north = {n: set(d.get("northbound", ())) for n, d in topology.nodes(data=True)}
+    south = {n: set(d.get("southbound", ())) for n, d in topology.nodes(data=True)}
+    return north, south
+
+
+def _build_directed(topology: nx.Graph, north: dict[str, set[str]],
+                    south: dict[str, set[str]]) -> nx.DiGraph:
     """Return a directed overlay with `direction` attributes (north/south).
 
     Any edge lacking *northbound* / *southbound* metadata on its endpoints is
     tagged "unknown" so it will be ignored by the valley‑free checker.
     """
+    def direction(u, v):
+        return "north" if v in north[u] else (
+            "south" if v in south[u] else "unknown")
+
+    # Both directions of every edge are inserted in bulk, in the same order as
+    # adding them one at a time would.
     G = nx.DiGraph()
-    for n, data in topology.nodes(data=True):
-        G.add_node(n, **data)
-
-    for u, v in topology.edges():
-        dir_uv = "north" if v in topology.nodes[u].get("northbound", []) else (
-            "south" if v in topology.nodes[u].get("southbound", []) else "unknown")
-        dir_vu = "north" if u in topology.nodes[v].get("northbound", []) else (
-            "south" if u in topology.nodes[v].get("southbound", []) else "unknown")
-        G.add_edge(u, v, direction=dir_uv)
-        G.add_edge(v, u, direction=dir_vu)
+    G.add_nodes_from(topology.nodes(data=True))
+    G.add_edges_from((a, b, {"direction": direction(a, b)})
+                     for u, v in topology.edges()
+                     for a, b in ((u, v), (v, u)))
     return G
 
 # ---------------------------------------------------------------------------
 # Valley‑free reachability check (north‑only, or north‑then‑south)
 # ---------------------------------------------------------------------------
 
-def _has_valley_free(G: nx.DiGraph, src: str, dst: str) -> bool:
+def _to_csr(G: nx.DiGraph, index: dict[str, int]):
+    """Flatten the directed overlay into CSR arrays (indptr, indices, direction)."""
+    indptr = np.zeros(len(index) + 1, dtype=np.int32)
+    indices = np.empty(G.number_of_edges(), dtype=np.int32)
+    direction = np.empty(G.number_of_edges(), dtype=np.int8)
+    pos = 0
+    for n, i in index.items():
+        for nbr, data in G.adj[n].items():
+            indices[pos] = index[nbr]
+            direction[pos] = _DIRECTION_CODES[data["direction"]]
+            pos += 1
+        indptr[i + 1] = pos
+    return indptr, indices, direction
+
+
+@njit(cache=True)
+def _has_valley_free(indptr, indices, direction, src, dst, seen, queue) -> bool:
+    """BFS over (node, phase) states; *seen* and *queue* are caller-owned scratch arrays of size 2V."""
+    if src == dst:
+        return True
+    seen[:] = 0
+    head = 0
+    tail = 1
+    queue[0] = src * 2 + _UP
+    seen[src * 2 + _UP] = 1
+    while head < tail:
+        state = queue[head]
+        head += 1
+        node = state // 2
+        phase = state % 2
+        for e in range(indptr[node], indptr[node + 1]):
+            d = direction[e]
+            if d == _UNKNOWN:
+                continue
+            if d == _NORTH:
+                if phase == _DOWN:
+                    continue
+                next_phase = _UP
+            else:
+                next_phase = _DOWN
+
+            nbr = indices[e]
+            if nbr == dst:
+                return True
+            nxt = nbr * 2 + next_phase
+            if seen[nxt] == 0:
+                seen[nxt] = 1
+                queue[tail] = nxt
+                tail += 1
+    return False
+
+def _has_valley_free_py(G: nx.DiGraph, src: str, dst: str) -> bool:
+    """Same BFS as *_has_valley_free*, walking the overlay's dicts directly.
+
+    Used when numba is missing, where the uncompiled kernel over numpy arrays
+    is slower than plain dict and set lookups.
+    """
     if src == dst:
         return True
-    q = deque([(src, "start")])  # (node, phase)
-    seen = set()
+    q = deque([(src, _UP)])  # (node, phase)
+    seen = {(src, _UP)}
     while q:
         node, phase = q.popleft()
-        if (node, phase) in seen:
-            continue
-        seen.add((node, phase))
-        for nbr in G.neighbors(node):
-            direction = G.edges[node, nbr]["direction"]
-            if direction == "unknown":
+        for nbr, data in G.adj[node].items():
+            d = data["direction"]
+            if d == "unknown":
                 continue
-            if phase == "start":
-                next_phase = "down" if direction == "south" else "up"
-            elif phase == "up":
-                if direction == "north":
-                    next_phase = "up"
-                elif direction == "south":
-                    next_phase = "down"
-                else:
+            if d == "north":
+                if phase == _DOWN:
                     continue
-            else:  # phase == down
-                if direction != "south":
-                    continue
-                next_phase = "down"
+                next_phase = _UP
+            else:
+                next_phase = _DOWN
 
             if nbr == dst:
                 return True
-            q.append((nbr, next_phase))
+            if (nbr, next_phase) not in seen:
+                seen.add((nbr, next_phase))
+                q.append((nbr, next_phase))
     return False
 
 # ---------------------------------------------------------------------------
 # Compute‑reachability classification
 # ---------------------------------------------------------------------------
 
-def _compute_reachability(G: nx.DiGraph) -> dict[str, bool]:
+def _compute_nodes(topology: nx.Graph) -> tuple[str, ...]:
+    """Return the compute (tier 0) nodes, classified once rather than per source node."""
+    return tuple(n for n, d in topology.nodes(data=True)
+                 if d.get("tier", 999) == 0 or str(n).startswith("C"))
+
+
+def _compute_reachability(G: nx.DiGraph, compute_nodes: tuple[str, ...]) -> dict[str, bool]:
     """Return a map node → *True* if it can reach *every* compute node."""
-    compute_nodes = [n for n, d in G.nodes(data=True)
-                     if d.get("tier", 999) == 0 or str(n).startswith("C")]
+    # The CSR arrays only pay for themselves when the kernel is compiled.
+    if HAVE_NUMBA:
+        index = {n: i for i, n in enumerate(G.nodes)}
+        indptr, indices, direction = _to_csr(G, index)
+        seen = np.zeros(2 * len(index), dtype=np.uint8)
+        queue = np.empty(2 * len(index), dtype=np.int64)
+
+        def reaches(src, dst):
+            return _has_valley_free(indptr, indices, direction,
+                                    index[src], index[dst], seen, queue)
+    else:
+        def reaches(src, dst):
+            return _has_valley_free_py(G, src, dst)
+
     status = {n: True for n in G.nodes}
     for src in G.nodes:
         for dst in compute_nodes:
             if src == dst:
                 continue
-            if not _has_valley_free(G, src, dst):
+            if not reaches(src, dst):
                 status[src] = False
                 break
     return status
 
+
 # ---------------------------------------------------------------------------
 # Blast‑radius edge detection – nodes that still reach every compute subnet but
 # have at least one *north‑bound* neighbour that does not.
 # ---------------------------------------------------------------------------
 
-def _detect_edge_nodes(topo: nx.Graph, reach_ok: dict[str, bool]) -> set[str]:
+def _detect_edge_nodes(north: dict[str, set[str]], reach_ok: dict[str, bool]) -> set[str]:
     edge_nodes: set[str] = set()
-    for n in topo.nodes:
+    for n, north_neighbours in north.items():
         if not reach_ok[n]:
             continue  # red, not edge
-        north_neighbours = topo.nodes[n].get("northbound", [])
         if not north_neighbours:
             continue  # top‑tier or isolated – either green or red, never edge
         if any(not reach_ok[p] for p in north_neighbours):
@@ -142,9 +231,11 @@ def drawFoldedClos(
         Draw the original untouched topology as a first figure.
     """
 
+    # A failure only removes an edge, so one layout serves both figures.
+    pos = _tier_layout(topology)
+
     # ---------- pristine diagram -------------------------------------------------
     if show_pristine:
-        pos = _tier_layout(topology)
         plt.figure(figsize=(10, 6))
         nx.draw_networkx_edges(topology, pos, width=1.2, alpha=0.5)
         tier_colors = [topology.nodes[n]["tier"] for n in topology.nodes]
@@ -169,9 +260,10 @@ def drawFoldedClos(
     topo_failed.remove_edge(u, v)
 
     # Reachability and edge detection
-    directed_failed = _build_directed(topo_failed)
-    reach_ok = _compute_reachability(directed_failed)
-    edge_nodes = _detect_edge_nodes(topo_failed, reach_ok)
+    north, south = _snapshot_nb(topology)
+    directed_failed = _build_directed(topo_failed, north, south)
+    reach_ok = _compute_reachability(directed_failed, _compute_nodes(topology))
+    edge_nodes = _detect_edge_nodes(north, reach_ok)
 
     # Colour map according to reachability category
     def _node_colour(n: str) -> str:
@@ -184,21 +276,25 @@ def drawFoldedClos(
     node_colors = [_node_colour(n) for n in topo_failed.nodes]
 
     # Draw
-    pos_f = _tier_layout(topo_failed)
     plt.figure(figsize=(10, 6))
-    nx.draw_networkx_edges(topo_failed, pos_f, width=1.2, alpha=0.4, edge_color="#bbbbbb")
+    nx.draw_networkx_edges(topo_failed, pos, width=1.2, alpha=0.4, edge_color="#bbbbbb")
 
-    # highlight failure link
-    xs, ys = zip(pos_f[u], pos_f[v])
-    plt.plot(xs, ys, linestyle="--", linewidth=2, color="#d62728", zorder=2)
+    # highlight failure link – dashed link plus an X at its midpoint, one artist
+    xs, ys = zip(pos[u], pos[v])
     mx, my = (sum(xs) / 2, sum(ys) / 2)
     dx = dy = 0.4
-    plt.plot([mx - dx, mx + dx], [my - dy, my + dy], color="#d62728", lw=2)
-    plt.plot([mx - dx, mx + dx], [my + dy, my - dy], color="#d62728", lw=2)
+    segments = [
+        [(xs[0], ys[0]), (xs[1], ys[1])],
+        [(mx - dx, my - dy), (mx + dx, my + dy)],
+        [(mx - dx, my + dy), (mx + dx, my - dy)],
+    ]
+    plt.gca().add_collection(LineCollection(segments, colors="#d62728", linewidths=2,
+                                            linestyles=["dashed", "solid", "solid"],
+                                            zorder=2))
 
-    nx.draw_networkx_nodes(topo_failed, pos_f, node_color=node_colors,
+    nx.draw_networkx_nodes(topo_failed, pos, node_color=node_colors,
                            edgecolors="black", node_size=850, linewidths=1.1)
-    nx.draw_networkx_labels(topo_failed, pos_f, font_size=8, font_weight="bold")
+    nx.draw_networkx_labels(topo_failed, pos, font_size=8, font_weight="bold")
 
     plt.title("After failure: reachability & blast radius")
     plt.axis("off")
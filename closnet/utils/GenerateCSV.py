@@ -1,17 +1,20 @@
 import re
 import csv
 import sys
+import mmap
+from operator import itemgetter
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Callable, Dict, Optional, Tuple
 
 # === Regex patterns for results.log ===
-TS     = re.compile(r"Experiment start time:\s+(\d+)")
-INTF   = re.compile(r"Interface failure time:\s+(\d+)")
-STOP   = re.compile(r"Experiment stop timestamp:\s+(\d+)")
-CONV   = re.compile(r"Convergence time:\s+(\d+)")
-BLAST  = re.compile(r"([\d.]+)% of nodes received")
-OVER   = re.compile(r"=== OVERHEAD ===\s+(\d+)\s+bytes", re.S)
-TRAFFC = re.compile(r"=== TRAFFIC ===\s+(.*)", re.S)
+# Bytes patterns, as results.log is scanned straight out of an mmap.
+TS     = re.compile(rb"Experiment start time:\s+(\d+)")
+INTF   = re.compile(rb"Interface failure time:\s+(\d+)")
+STOP   = re.compile(rb"Experiment stop timestamp:\s+(\d+)")
+CONV   = re.compile(rb"Convergence time:\s+(\d+)")
+BLAST  = re.compile(rb"([\d.]+)% of nodes received")
+OVER   = re.compile(rb"=== OVERHEAD ===\s+(\d+)\s+bytes", re.S)
+TRAFFC = re.compile(rb"=== TRAFFIC ===\s+(.*)", re.S)
 
 # === Regex patterns for experiment.log ===
 FAIL_NODE   = re.compile(r"Failed node:\s+(\S+)")
@@ -20,12 +23,27 @@ FAIL_NEIGH  = re.compile(r"Failed neighbor:\s+(\S+)")
 FAIL_TYPE   = re.compile(r"(?:Failure|Experiment)\s+type:\s+(.+)", re.I)
 
 
-def parse(exp_dir: Path, is_bgp: bool) -> Optional[Tuple]:
-    """Parse *results.log* and *experiment.log* inside *exp_dir*.
-
-    If *is_bgp* is **True**, an extra *bfd* field ("true"/"false") is inserted
-    immediately after *failure_type* in the returned tuple.
-    """
+# === CSV layout ===
+# One spec drives both the header and the row tuple so the two can't drift.
+FIELDS: Tuple[str, ...] = (
+    "experiment_start_time",
+    "interface_failure_time",
+    "experiment_stop_time",
+    "failed_node",
+    "failed_neighbor",
+    "failure_type",
+    "convergence_time_ms",
+    "blast_radius_percent",
+    "overhead_bytes",
+    "traffic_result",
+)
+# BGP rows carry an extra *bfd* column right after *failure_type*.
+_BFD_AT = FIELDS.index("failure_type") + 1
+BGP_FIELDS: Tuple[str, ...] = FIELDS[:_BFD_AT] + ("bfd",) + FIELDS[_BFD_AT:]
+
+
+def _extract(exp_dir: Path) -> Optional[Dict[str, object]]:
+    """Read every metric out of *results.log* / *experiment.log*, keyed by CSV column."""
     res_path = exp_dir / "results.log"
     exp_path = exp_dir / "experiment.log"
 
@@ -34,15 +52,10 @@ def parse(exp_dir: Path, is_bgp: bool) -> Optional[Tuple]:
         return None
 
     try:
-        res_txt = res_path.read_text()
         exp_txt = exp_path.read_text() if exp_path.exists() else ""
 
-        start_ts  = int(TS.search(res_txt).group(1))
-        intf_ts   = int(INTF.search(res_txt).group(1))
-        stop_ts   = int(STOP.search(res_txt).group(1))
-
-        failed_node  = FAIL_NODE.search(exp_txt).group(1) if FAIL_NODE.search(exp_txt) else "Unknown"
-        failed_neigh = FAIL_NEIGH.search(exp_txt).group(1) if FAIL_NEIGH.search(exp_txt) else "Unknown"
+        node_match  = FAIL_NODE.search(exp_txt)
+        neigh_match = FAIL_NEIGH.search(exp_txt)
 
         # -- Failure type & (optional) BFD flag --
         ftype_match = FAIL_TYPE.search(exp_txt)
@@ -60,27 +73,52 @@ def parse(exp_dir: Path, is_bgp: bool) -> Optional[Tuple]:
             failure_type = "unknown"
             bfd_flag = "false"
 
-        convergence_ms = int(CONV.search(res_txt).group(1))
-        blast_pct      = float(BLAST.search(res_txt).group(1))
-        overhead_bytes = int(OVER.search(res_txt).group(1))
-        traffic        = TRAFFC.search(res_txt).group(1).strip() if TRAFFC.search(res_txt) else "None"
-
-        base: List = [
-            start_ts, intf_ts, stop_ts,
-            failed_node, failed_neigh, failure_type,
-        ]
-        if is_bgp:
-            base.append(bfd_flag)  # will sit right after failure_type
-        base.extend([
-            convergence_ms, blast_pct, overhead_bytes, traffic,
-        ])
-        return tuple(base)
+        # Map results.log instead of reading it in, only the matched groups get copied out.
+        with open(res_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as res_txt:
+            traffic_match = TRAFFC.search(res_txt)
+
+            return {
+                "experiment_start_time":  int(TS.search(res_txt).group(1)),
+                "interface_failure_time": int(INTF.search(res_txt).group(1)),
+                "experiment_stop_time":   int(STOP.search(res_txt).group(1)),
+                "failed_node":            node_match.group(1) if node_match else "Unknown",
+                "failed_neighbor":        neigh_match.group(1) if neigh_match else "Unknown",
+                "failure_type":           failure_type,
+                "bfd":                    bfd_flag,
+                "convergence_time_ms":    int(CONV.search(res_txt).group(1)),
+                "blast_radius_percent":   float(BLAST.search(res_txt).group(1)),
+                "overhead_bytes":         int(OVER.search(res_txt).group(1)),
+                "traffic_result":         traffic_match.group(1).decode().strip() if traffic_match else "None",
+            }
 
     except (AttributeError, ValueError) as e:
         sys.stderr.write(f"[WARN] Malformed logs in {exp_dir}: {e}\n")
         return None
 
 
+def parse_factory(fields: Tuple[str, ...]) -> Callable[[Path], Optional[Tuple]]:
+    """Build a parser whose rows follow the column order in *fields*."""
+    row = itemgetter(*fields)
+
+    def _parse(exp_dir: Path) -> Optional[Tuple]:
+        values = _extract(exp_dir)
+        return row(values) if values else None
+
+    return _parse
+
+
+_PARSERS = {False: parse_factory(FIELDS), True: parse_factory(BGP_FIELDS)}
+
+
+def parse(exp_dir: Path, is_bgp: bool) -> Optional[Tuple]:
+    """Parse *results.log* and *experiment.log* inside *exp_dir*.
+
+    If *is_bgp* is **True**, an extra *bfd* field ("true"/"false") is inserted
+    immediately after *failure_type* in the returned tuple.
+    """
+    return _PARSERS[is_bgp](exp_dir)
+
+
 def run(protocol: str, topo: str) -> None:
     """Aggregate experiment metrics under *logs/<protocol>* for *topo*.
 
@@ -88,11 +126,12 @@ def run(protocol: str, topo: str) -> None:
       *failure_type*.
     """
     is_bgp = protocol.lower() == "bgp"
+    parser = _PARSERS[is_bgp]
     root = Path("logs") / protocol
     rows = []
 
     for exp_dir in sorted(root.glob(f"{topo}_*/")):
-        tup = parse(exp_dir, is_bgp)
+        tup = parser(exp_dir)
         if tup:
             rows.append(tup)
 
@@ -100,22 +139,7 @@ def run(protocol: str, topo: str) -> None:
         sys.exit("No matching experiments found.")
 
     out = root / f"{topo}_aggregate_results.csv"
-    hdr = [
-        "experiment_start_time",
-        "interface_failure_time",
-        "experiment_stop_time",
-        "failed_node",
-        "failed_neighbor",
-        "failure_type",
-    ]
-    if is_bgp:
-        hdr.append("bfd")  # right after failure_type
-    hdr.extend([
-        "convergence_time_ms",
-        "blast_radius_percent",
-        "overhead_bytes",
-        "traffic_result",
-    ])
+    hdr = BGP_FIELDS if is_bgp else FIELDS
 
     with out.open("w", newline="") as f:
         writer = csv.writer(f)
@@ -0,0 +1,19 @@
+"""
+Desc: Optional numba support. njit compiles integer-only kernels when numba is installed
+and leaves them as regular Python functions when it is not. HAVE_NUMBA tells callers
+which of the two they got, so they can keep a pure-Python path for the latter.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        # Support both the bare @njit and the @njit(cache=True) forms.
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+__all__ = ["njit", "HAVE_NUMBA"]
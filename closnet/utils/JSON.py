@@ -0,0 +1,17 @@
+"""
+Desc: Optional orjson support. dumps serializes with orjson when it is installed
+and falls back to the standard json module when it is not.
+"""
+
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":"))
+
+__all__ = ["dumps"]
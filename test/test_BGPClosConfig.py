@@ -0,0 +1,118 @@
+'''
+Checks the integer subnet allocation in BGPClosConfig against the IPv4Network.subnets() lists it replaced.
+'''
+
+# External libraries
+import unittest
+from ipaddress import IPv4Network
+
+# Custom libraries
+from closnet.protocols.bgp.config.BGPClosConfig import BGPClosConfig
+
+
+class ReferenceBGPClosConfig(BGPClosConfig):
+    '''
+    Addresses nodes by popping subnets off materialised IPv4Network.subnets() lists, as BGPClosConfig did before.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.coreNetworks = list(IPv4Network(self.LEAF_SPINE_SUPERNET).subnets(prefixlen_diff=self.LEAF_SPINE_SUBNET_BITS))
+        self.edgeNetworks = list(IPv4Network(self.COMPUTE_SUPERNET).subnets(prefixlen_diff=self.COMPUTE_SUBNET_BITS))
+
+    def addressEdgeNodes(self, northNode, southNode):
+        if(northNode in self.leafComputeSubnets):
+            subnet = self.leafComputeSubnets[northNode]
+        else:
+            subnet = list(self.edgeNetworks.pop(0))[:-1]
+
+            networkAddress = subnet.pop(0)
+            northAddress = subnet.pop()
+
+            self.clos.nodes[northNode]["advertise"].append(f"{networkAddress}/24")
+
+            if(self.singleComputeSubnet):
+                self.leafComputeSubnets[northNode] = subnet
+                self.clos.nodes[northNode]["ipv4"]["compute"] = str(northAddress)
+            else:
+                self.clos.nodes[northNode]["ipv4"][southNode] = str(northAddress)
+
+        southAddress = subnet.pop(0)
+        self.clos.nodes[southNode]["ipv4"][northNode] = str(southAddress)
+
+    def addressCoreNodes(self, northNode, southNode):
+        subnet = list(self.coreNetworks.pop(0))[1:-1]
+
+        self.clos.nodes[northNode]["ipv4"][southNode] = str(subnet.pop(0))
+        self.clos.nodes[southNode]["ipv4"][northNode] = str(subnet.pop(0))
+
+
+def addressing(topology):
+    return {node: (attrs["ipv4"], attrs["advertise"]) for node, attrs in topology.clos.nodes.items()}
+
+
+class BGPAddressingTest(unittest.TestCase):
+
+    def assertSameAddressing(self, k, t, **kwargs):
+        built = BGPClosConfig(k, t, **kwargs)
+        built.buildGraph()
+
+        reference = ReferenceBGPClosConfig(k, t, **kwargs)
+        reference.buildGraph()
+
+        self.assertEqual(addressing(built), addressing(reference))
+
+        return built
+
+    def test_matches_subnet_lists(self):
+        for k, t in ((4, 2), (4, 3), (6, 3)):
+            for singleComputeSubnet in (False, True):
+                with self.subTest(k=k, t=t, singleComputeSubnet=singleComputeSubnet):
+                    self.assertSameAddressing(k, t, singleComputeSubnet=singleComputeSubnet)
+
+    def test_first_and_last_subnets(self):
+        topology = self.assertSameAddressing(4, 3)
+        coreNetworks = list(IPv4Network(BGPClosConfig.LEAF_SPINE_SUPERNET).subnets(prefixlen_diff=BGPClosConfig.LEAF_SPINE_SUBNET_BITS))
+        edgeNetworks = list(IPv4Network(BGPClosConfig.COMPUTE_SUPERNET).subnets(prefixlen_diff=BGPClosConfig.COMPUTE_SUBNET_BITS))
+
+        # The first core network is the first edge built, T3_1 down to its first spine.
+        nodes = topology.clos.nodes
+        self.assertEqual(nodes["T3_1"]["ipv4"]["S2_11"], str(coreNetworks[0][1]))
+        self.assertEqual(nodes["S2_11"]["ipv4"]["T3_1"], str(coreNetworks[0][2]))
+        self.assertEqual(topology.nextCoreNetwork, 32)
+
+        # One edge network per compute node, the last one on the last leaf's last compute node.
+        self.assertEqual(nodes["L1_11"]["advertise"][0], f"{edgeNetworks[0].network_address}/24")
+        self.assertEqual(nodes["L1_11"]["ipv4"]["C0_111"], str(edgeNetworks[0][-2]))
+        self.assertEqual(nodes["C0_111"]["ipv4"]["L1_11"], str(edgeNetworks[0][1]))
+        self.assertEqual(topology.nextEdgeNetwork, 16)
+        self.assertEqual(nodes["L1_42"]["advertise"][-1], f"{edgeNetworks[15].network_address}/24")
+        self.assertEqual(nodes["C0_422"]["ipv4"]["L1_42"], str(edgeNetworks[15][1]))
+
+    def test_single_compute_subnet_reuse(self):
+        topology = self.assertSameAddressing(4, 2, singleComputeSubnet=True)
+        nodes = topology.clos.nodes
+
+        # Each leaf advertises one subnet and hands its compute nodes consecutive low host addresses.
+        self.assertEqual(nodes["L1_1"]["advertise"], ["192.168.0.0/24"])
+        self.assertEqual(nodes["L1_1"]["ipv4"]["compute"], "192.168.0.254")
+        self.assertEqual(nodes["C0_11"]["ipv4"]["L1_1"], "192.168.0.1")
+        self.assertEqual(nodes["C0_12"]["ipv4"]["L1_1"], "192.168.0.2")
+        self.assertEqual(topology.nextEdgeNetwork, len(topology.nodesByTier[BGPClosConfig.LEAF_TIER]))
+
+        # A /24 holds 253 compute nodes once the leaf has its address.
+        self.assertSameAddressing(4, 2, southboundPortsConfig={1: 253}, singleComputeSubnet=True)
+        with self.assertRaises(IndexError):
+            BGPClosConfig(4, 2, southboundPortsConfig={1: 254}, singleComputeSubnet=True).buildGraph()
+
+    def test_edge_supernet_exhausted(self):
+        # k=16, t=3 has 1024 compute nodes but only 256 edge subnets.
+        with self.assertRaises(IndexError):
+            BGPClosConfig(16, 3).buildGraph()
+
+        with self.assertRaises(IndexError):
+            ReferenceBGPClosConfig(16, 3).buildGraph()
+
+
+if __name__ == '__main__':
+    unittest.main()
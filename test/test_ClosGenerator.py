@@ -0,0 +1,121 @@
+'''
+Checks that the integer edge enumeration in ClosGenerator builds the same folded-Clos as the original string-based BFS.
+'''
+
+# External libraries
+import unittest
+
+# Custom libraries
+from closnet.ClosGenerator import ClosGenerator
+
+
+class RecordingClosGenerator(ClosGenerator):
+    '''
+    Records every connectNodes call instead of building the graph.
+    '''
+
+    def __init__(self, k, t, southboundPortsConfig=None):
+        super().__init__(k, t, southboundPortsConfig=southboundPortsConfig)
+        self.connections = []
+
+    def connectNodes(self, northNode, southNode, northTier, southTier):
+        self.connections.append((northNode, southNode, northTier, southTier))
+
+    def finalizeGraph(self):
+        return
+
+    def buildGraphReference(self):
+        '''
+        The string-based modified BFS buildGraph used before the integer enumeration, kept as the reference answer.
+        '''
+
+        k = self.sharedDegree
+        t = self.numTiers
+
+        currentTierPrefix = [""]
+        nextTierPrefix = []
+
+        currentPodNodes = (k//2)**(t-1)
+        topTier = t
+        currentTier = t
+
+        while currentTierPrefix:
+            currentPrefix = currentTierPrefix.pop(0)
+            nodeNum = 0
+
+            for node in range(1, currentPodNodes+1):
+                northNode = self.generateNode(currentPrefix, str(node), currentTier, topTier)
+
+                for intf in range(1, self.southboundPorts[currentTier] + 1):
+                    if(currentTier > self.LOWEST_SPINE_TIER):
+                        southPrefix = currentPrefix + str(intf)
+                        if(southPrefix not in nextTierPrefix):
+                            nextTierPrefix.append(southPrefix)
+                        southNodeNum = (nodeNum%(currentPodNodes // (k//2)))+1
+
+                    elif(currentTier == self.LOWEST_SPINE_TIER):
+                        southPrefix = currentPrefix
+                        if(southPrefix not in nextTierPrefix):
+                            nextTierPrefix.append(southPrefix)
+                        southNodeNum = intf
+
+                    elif(currentTier == self.LEAF_TIER):
+                        southPrefix = northNode.split('_', 1)[1]
+                        southNodeNum = intf
+
+                    southNode = self.generateNode(southPrefix, str(southNodeNum), currentTier-1, topTier)
+
+                    self.connectNodes(northNode, southNode, currentTier, currentTier-1)
+
+                nodeNum += 1
+
+            if(not currentTierPrefix):
+                currentTierPrefix = list(nextTierPrefix)
+                nextTierPrefix.clear()
+
+                if(currentTier == topTier and topTier == self.LOWEST_SPINE_TIER):
+                    currentPodNodes = k
+
+                if(currentTier > self.LOWEST_SPINE_TIER):
+                    currentPodNodes = currentPodNodes // (k//2)
+
+                currentTier -= 1
+
+        return
+
+
+class EnumerateClosEdgesTest(unittest.TestCase):
+
+    def assertSameConnections(self, k, t, southboundPortsConfig=None):
+        built = RecordingClosGenerator(k, t, southboundPortsConfig)
+        built.buildGraph()
+
+        reference = RecordingClosGenerator(k, t, southboundPortsConfig)
+        reference.buildGraphReference()
+
+        self.assertEqual(built.connections, reference.connections)
+
+        return built.connections
+
+    def test_default_ports(self):
+        for k, t in ((4, 2), (4, 3), (6, 3), (4, 4), (8, 3)):
+            with self.subTest(k=k, t=t):
+                self.assertTrue(self.assertSameConnections(k, t))
+
+    def test_custom_southbound_ports(self):
+        for k, t, ports in ((4, 3, {3: 2}), (4, 3, {2: 1}), (6, 3, {1: 2, 3: 4}), (4, 4, {3: 1, 1: 4})):
+            with self.subTest(k=k, t=t, ports=ports):
+                self.assertTrue(self.assertSameConnections(k, t, ports))
+
+    def test_zero_southbound_ports(self):
+        # No southbound ports on a tier leaves nothing below it, and on the top tier nothing at all.
+        self.assertEqual(self.assertSameConnections(4, 3, {3: 0}), [])
+        self.assertTrue(self.assertSameConnections(4, 3, {2: 0}))
+
+        built = ClosGenerator(4, 3, southboundPortsConfig={3: 0})
+        built.buildGraph()
+        self.assertEqual(len(built.clos), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+'''
+Checks that ClosGraph behaves like the NetworkX Graph it replaced and exports to it without losing anything.
+'''
+
+# External libraries
+import json
+import unittest
+import networkx as nx
+
+# Custom libraries
+from closnet.ClosGraph import ClosGraph
+from closnet.protocols.bgp.config.BGPClosConfig import BGPClosConfig
+from closnet.protocols.mtp.config.MTPClosConfig import MTPClosConfig
+
+
+# Edges added out of node order, so that some are reported from their second endpoint.
+EDGES = (("T2_1", "L1_1"), ("L1_2", "T2_1"), ("C0_11", "L1_1"), ("L1_2", "T2_2"), ("T2_2", "L1_1"))
+
+
+def buildBoth(edges):
+    closGraph = ClosGraph()
+    nxGraph = nx.Graph()
+
+    for number, (u, v) in enumerate(edges):
+        closGraph.add_edge(u, v, number=number)
+        nxGraph.add_edge(u, v, number=number)
+
+    return closGraph, nxGraph
+
+
+class ClosGraphTest(unittest.TestCase):
+
+    def assertRoundTrips(self, closConfig):
+        closConfig.buildGraph()
+        clos = closConfig.clos
+
+        # Saved and loaded the same way __main__ stores topology configurations
+        graph = nx.node_link_graph(json.loads(json.dumps(nx.node_link_data(clos.toNetworkx()))))
+
+        self.assertEqual(graph.graph, clos.graph)
+        self.assertEqual(list(graph.nodes), list(clos.nodes))
+        self.assertEqual(dict(graph.nodes(data=True)), clos.nodes)
+        self.assertEqual(graph.number_of_edges(), len(clos.edges))
+        for u, v, attr in clos.edges.data():
+            self.assertTrue(graph.has_edge(u, v))
+            self.assertEqual(graph.edges[u, v], attr)
+
+    def test_edge_order_matches_networkx(self):
+        closGraph, nxGraph = buildBoth(EDGES)
+
+        self.assertEqual(list(closGraph.edges()), list(nxGraph.edges()))
+        self.assertEqual(list(closGraph.edges.data()), list(nxGraph.edges(data=True)))
+        self.assertEqual(closGraph.edges["L1_1", "T2_2"], nxGraph.edges["L1_1", "T2_2"])
+
+    def test_cached_edges_follow_new_edges(self):
+        closGraph, nxGraph = buildBoth(EDGES[:3])
+
+        # Walk (and cache) the edges before the graph changes
+        self.assertEqual(list(closGraph.edges()), list(nxGraph.edges()))
+        self.assertEqual(len(closGraph.edges), 3)
+
+        for number, (u, v) in enumerate(EDGES[3:], start=3):
+            closGraph.add_edge(u, v, number=number)
+            nxGraph.add_edge(u, v, number=number)
+
+        self.assertEqual(len(closGraph.edges), len(EDGES))
+        self.assertEqual(list(closGraph.edges()), list(nxGraph.edges()))
+        self.assertEqual(list(closGraph.edges.data()), list(nxGraph.edges(data=True)))
+
+    def test_cached_edges_share_attributes(self):
+        closGraph, _ = buildBoth(EDGES)
+        list(closGraph.edges.data())
+
+        # Updating an existing edge changes its attributes in place, as seen through the cached view
+        closGraph.add_edge("T2_1", "L1_1", weight=2)
+        self.assertEqual(dict(((u, v), attr) for u, v, attr in closGraph.edges.data())[("T2_1", "L1_1")],
+                         {"number": 0, "weight": 2})
+
+        closGraph.edges.invalidate()
+        self.assertEqual(len(closGraph.edges), len(EDGES))
+        self.assertEqual(len(list(closGraph.edges())), len(EDGES))
+
+    def test_bgp_round_trip(self):
+        self.assertRoundTrips(BGPClosConfig(4, 3))
+
+    def test_mtp_round_trip(self):
+        self.assertRoundTrips(MTPClosConfig(4, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
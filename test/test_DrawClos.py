@@ -0,0 +1,121 @@
+'''
+Checks the valley-free reachability used by DrawClos against the original dict-based BFS.
+
+Run it both with numba and with NUMBA_DISABLE_JIT=1 so the compiled and the plain Python kernels are covered.
+'''
+
+# External libraries
+import unittest
+from collections import deque
+import networkx as nx
+import numpy as np
+
+# Custom libraries
+from closnet.protocols.mtp.config.MTPClosConfig import MTPClosConfig
+import closnet.utils.DrawClos as DrawClos
+
+
+def referenceValleyFree(G, src, dst):
+    '''
+    The dict-based BFS DrawClos used before the CSR kernel, kept as the reference answer.
+    '''
+
+    if src == dst:
+        return True
+    q = deque([(src, "start")])
+    seen = set()
+    while q:
+        node, phase = q.popleft()
+        if (node, phase) in seen:
+            continue
+        seen.add((node, phase))
+        for nbr in G.neighbors(node):
+            direction = G.edges[node, nbr]["direction"]
+            if direction == "unknown":
+                continue
+            if phase == "start":
+                next_phase = "down" if direction == "south" else "up"
+            elif phase == "up":
+                next_phase = "up" if direction == "north" else "down"
+            else:
+                if direction != "south":
+                    continue
+                next_phase = "down"
+
+            if nbr == dst:
+                return True
+            q.append((nbr, next_phase))
+    return False
+
+
+def referenceReachability(G, computeNodes):
+    return {src: all(referenceValleyFree(G, src, dst) for dst in computeNodes) for src in G.nodes}
+
+
+def buildTopology(k, t):
+    '''
+    Build a folded-Clos and load it the same way __main__ does, through its saved node-link form.
+    '''
+
+    clos = MTPClosConfig(k, t)
+    clos.buildGraph()
+
+    return nx.node_link_graph(nx.node_link_data(clos.clos.toNetworkx()))
+
+
+class ValleyFreeReachabilityTest(unittest.TestCase):
+    # One failure at each tier boundary of a k=4, t=3 folded-Clos
+    FAILED_LINKS = (("T3_1", "S2_11"), ("S2_21", "L1_21"), ("L1_11", "C0_111"))
+
+    def setUp(self):
+        self.topology = buildTopology(4, 3)
+        self.north, self.south = DrawClos._snapshot_nb(self.topology)
+        self.computeNodes = DrawClos._compute_nodes(self.topology)
+
+    def failLink(self, failedLink):
+        failed = self.topology.copy()
+        failed.remove_edge(*failedLink)
+
+        return DrawClos._build_directed(failed, self.north, self.south)
+
+    def test_kernel_matches_reference(self):
+        for failedLink in self.FAILED_LINKS:
+            G = self.failLink(failedLink)
+            index = {n: i for i, n in enumerate(G.nodes)}
+            indptr, indices, direction = DrawClos._to_csr(G, index)
+            seen = np.zeros(2 * len(index), dtype=np.uint8)
+            queue = np.empty(2 * len(index), dtype=np.int64)
+
+            with self.subTest(failedLink=failedLink):
+                for src in G.nodes:
+                    for dst in self.computeNodes:
+                        expected = referenceValleyFree(G, src, dst)
+                        self.assertEqual(DrawClos._has_valley_free(indptr, indices, direction,
+                                                                   index[src], index[dst], seen, queue), expected)
+                        self.assertEqual(DrawClos._has_valley_free_py(G, src, dst), expected)
+
+    def test_reachability_matches_reference(self):
+        for failedLink in self.FAILED_LINKS:
+            G = self.failLink(failedLink)
+            expected = referenceReachability(G, self.computeNodes)
+            self.assertFalse(all(expected.values()))
+
+            # Cover both the CSR kernel and the dict BFS used when numba is missing
+            for haveNumba in (True, False):
+                with self.subTest(failedLink=failedLink, haveNumba=haveNumba):
+                    original = DrawClos.HAVE_NUMBA
+                    DrawClos.HAVE_NUMBA = haveNumba
+                    try:
+                        self.assertEqual(DrawClos._compute_reachability(G, self.computeNodes), expected)
+                    finally:
+                        DrawClos.HAVE_NUMBA = original
+
+    def test_compute_nodes_not_cached_on_graph(self):
+        self.assertNotIn("_compute_nodes", self.topology.graph)
+
+        self.topology.remove_node(self.computeNodes[0])
+        self.assertEqual(DrawClos._compute_nodes(self.topology), self.computeNodes[1:])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+'''
+Checks the integer compute subnet allocation in MTPClosConfig against the IPv4Network.subnets() list it replaced.
+'''
+
+# External libraries
+import unittest
+from ipaddress import IPv4Network
+
+# Custom libraries
+from closnet.protocols.mtp.config.MTPClosConfig import MTPClosConfig
+
+
+EDGE_NETWORKS = list(IPv4Network(MTPClosConfig.COMPUTE_SUPERNET).subnets(prefixlen_diff=MTPClosConfig.COMPUTE_SUBNET_BITS))
+
+
+class ReferenceMTPClosConfig(MTPClosConfig):
+    '''
+    Addresses compute nodes by popping subnets off a materialised IPv4Network.subnets() list, as MTPClosConfig did before.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.edgeNetworks = list(EDGE_NETWORKS)
+
+    def addressEdgeNodes(self, northNode, southNode):
+        if(northNode in self.leafComputeSubnets):
+            subnet = self.leafComputeSubnets[northNode]
+        else:
+            subnet = list(self.edgeNetworks.pop(0))[1:-1]
+            northAddress = subnet.pop()
+
+            if(self.singleComputeSubnet):
+                self.leafComputeSubnets[northNode] = subnet
+                self.clos.nodes[northNode]["ipv4"]["compute"] = str(northAddress)
+            else:
+                self.clos.nodes[northNode]["ipv4"][southNode] = str(northAddress)
+
+        southAddress = subnet.pop(0)
+        self.clos.nodes[southNode]["ipv4"][northNode] = str(southAddress)
+
+
+def addressing(topology):
+    return {node: attrs["ipv4"] for node, attrs in topology.clos.nodes.items()}
+
+
+class MTPAddressingTest(unittest.TestCase):
+
+    def assertSameAddressing(self, k, t, **kwargs):
+        built = MTPClosConfig(k, t, **kwargs)
+        built.buildGraph()
+
+        reference = ReferenceMTPClosConfig(k, t, **kwargs)
+        reference.buildGraph()
+
+        self.assertEqual(addressing(built), addressing(reference))
+
+        return built
+
+    def test_matches_subnet_list(self):
+        for k, t in ((4, 2), (4, 3), (8, 3)):
+            with self.subTest(k=k, t=t):
+                self.assertSameAddressing(k, t)
+
+    def test_first_and_last_subnets(self):
+        topology = self.assertSameAddressing(4, 3)
+        nodes = topology.clos.nodes
+
+        self.assertEqual(nodes["L1_11"]["ipv4"]["C0_111"], str(EDGE_NETWORKS[0][-2]))
+        self.assertEqual(nodes["C0_111"]["ipv4"]["L1_11"], str(EDGE_NETWORKS[0][1]))
+
+        self.assertEqual(topology.nextEdgeNetwork, 16)
+        self.assertEqual(nodes["L1_42"]["ipv4"]["C0_422"], str(EDGE_NETWORKS[15][-2]))
+        self.assertEqual(nodes["C0_422"]["ipv4"]["L1_42"], str(EDGE_NETWORKS[15][1]))
+
+    def test_single_compute_subnet_reuse(self):
+        for k, t in ((4, 2), (4, 3)):
+            with self.subTest(k=k, t=t):
+                self.assertSameAddressing(k, t, singleComputeSubnet=True)
+
+        # Each leaf keeps one subnet and hands its compute nodes consecutive low host addresses.
+        topology = self.assertSameAddressing(4, 2, singleComputeSubnet=True)
+        nodes = topology.clos.nodes
+        self.assertEqual(nodes["L1_1"]["ipv4"]["compute"], "192.168.0.254")
+        self.assertEqual(nodes["C0_11"]["ipv4"]["L1_1"], "192.168.0.1")
+        self.assertEqual(nodes["C0_12"]["ipv4"]["L1_1"], "192.168.0.2")
+        self.assertEqual(topology.nextEdgeNetwork, len(topology.nodesByTier[MTPClosConfig.LEAF_TIER]))
+
+    def test_compute_subnet_hosts_exhausted(self):
+        # A /24 holds 253 compute nodes once the leaf has its address.
+        self.assertSameAddressing(4, 2, southboundPortsConfig={1: 253}, singleComputeSubnet=True)
+
+        with self.assertRaises(IndexError):
+            MTPClosConfig(4, 2, southboundPortsConfig={1: 254}, singleComputeSubnet=True).buildGraph()
+
+        with self.assertRaises(IndexError):
+            ReferenceMTPClosConfig(4, 2, southboundPortsConfig={1: 254}, singleComputeSubnet=True).buildGraph()
+
+    def test_edge_supernet_exhausted(self):
+        # k=16, t=3 has 1024 compute nodes but only 256 compute subnets.
+        with self.assertRaises(IndexError):
+            MTPClosConfig(16, 3).buildGraph()
+
+        with self.assertRaises(IndexError):
+            ReferenceMTPClosConfig(16, 3).buildGraph()
+
+
+if __name__ == '__main__':
+    unittest.main()